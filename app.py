@@ -1,208 +1,582 @@
-from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, Request, Response, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import ORJSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
 import logging
+import logging.handlers
+import queue
 import time
 import asyncio
-from flask_app.data.marketdata import MarketData
+import functools
+import hashlib
+import itertools
+import operator
+import orjson
+from cachetools import Cache, TTLCache
+import redis.asyncio as redis
+from flask_app.data.marketdata import MarketData, Quote, SYMBOL_PATTERN
 from flask_app.config import Config
 
-app = FastAPI()
-
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s [%(levelname)s] [%(threadName)s] %(name)s: %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('app.log')
-    ]
-)
+app = FastAPI(default_response_class=ORJSONResponse)
+# Level-1 gzip for larger screen responses when the client accepts it
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=1)
+
+# Configure logging: records are queued by the request path and written out by a listener thread
+log_formatter = logging.Formatter('%(asctime)s [%(levelname)s] [%(threadName)s] %(name)s: %(message)s')
+log_handlers = [
+    logging.StreamHandler(),
+    logging.handlers.RotatingFileHandler('app.log', maxBytes=50_000_000, backupCount=3)
+]
+for handler in log_handlers:
+    handler.setFormatter(log_formatter)
+log_queue = queue.SimpleQueue()
+log_listener = logging.handlers.QueueListener(log_queue, *log_handlers, respect_handler_level=True)
+log_listener.start()
+# The queue handler passes the bare message through; the listener's handlers apply the full format
+queue_handler = logging.handlers.QueueHandler(log_queue)
+queue_handler.setFormatter(logging.Formatter('%(message)s'))
+logging.basicConfig(level=Config.LOG_LEVEL, handlers=[queue_handler])
 logger = logging.getLogger(__name__)
 
-# Initialize MarketData
-market_data = MarketData()
-
-# In-memory caches
-stock_cache = {}
-volume_cache = {}
+@functools.cache
+def get_market_data() -> MarketData:
+    """
+    Create the shared MarketData instance on first use, keeping it off the import path.
+    """
+    return MarketData()
 
 # Configuration constants
 CACHE_TTL = 10  # Cache time-to-live in seconds
+CACHE_MAXSIZE = 1024  # Maximum number of entries per cache before LRU eviction
+BATCH_WINDOW = Config.BATCH_WINDOW_MS / 1000  # Seconds to collect concurrent quote requests into one upstream call
+QUOTE_FIELDS = Quote.__required_keys__  # Keys every quote dict must carry
+JSON_OFFLOAD_THRESHOLD = 16 * 1024  # Request bodies larger than this (bytes) are parsed off the event loop
 MAX_SYMBOLS = 50  # Maximum number of symbols per request
+MAX_BODY_BYTES = 64 * 1024  # Request bodies larger than this are rejected before parsing
+QUOTE_PUSH_INTERVAL = 5  # Seconds between quote checks for WebSocket subscribers
+MAX_SUBSCRIBED_SYMBOLS = 4 * MAX_SYMBOLS  # Maximum symbols per WebSocket subscription (fetched in MAX_SYMBOLS chunks)
 MAX_REQUESTS_PER_MINUTE = 60  # Rate limit: requests per minute per client
-request_counts = {}  # Track requests per client IP for rate limiting
+RATE_LIMIT_CAPACITY = MAX_REQUESTS_PER_MINUTE  # Token bucket size (maximum burst per client)
+RATE_LIMIT_REFILL_RATE = MAX_REQUESTS_PER_MINUTE / 60.0  # Tokens added back per second
+RATE_LIMIT_SWEEP_INTERVAL = 60  # Seconds between sweeps of idle client buckets
+request_counts = {}  # Token bucket per client IP: [tokens, last_refill]
+
+# Redis is shared by all worker processes; without it each worker caches on its own
+redis_client = redis.from_url(Config.REDIS_URL) if Config.REDIS_URL else None
+
+class ValueAwareTTLCache(TTLCache):
+    """
+    TTLCache with value-aware (v-LRU) overflow eviction.
+    Among the oldest tenth of entries, the one with the lowest cost + hits is
+    evicted, so entries covering many symbols and frequently reused entries survive
+    bursts of one-off keys.
+    Args:
+        cost: Callable returning an entry's value in symbols covered
+            (e.g. len for per-symbol dicts, a constant 1 for single-symbol entries).
+    """
+    def __init__(self, maxsize, ttl, cost):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.cost = cost
+        self.hits = {}
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.hits[key] = self.hits.get(key, 0) + 1
+        return value
+
+    def __delitem__(self, key):
+        self.hits.pop(key, None)
+        super().__delitem__(key)
+
+    def expire(self, time=None):
+        expired = super().expire(time)
+        for key, _ in expired:
+            self.hits.pop(key, None)
+        return expired
+
+    def popitem(self):
+        self.expire()
+        candidates = list(itertools.islice(iter(self), max(1, len(self) // 10)))
+        if not candidates:
+            raise KeyError(f"{type(self).__name__} is empty")
+        key = min(candidates, key=lambda k: self.cost(Cache.__getitem__(self, k)) + self.hits.get(k, 0))
+        value = Cache.__getitem__(self, key)
+        del self[key]
+        return key, value
+
+class SharedCache:
+    """
+    Quote cache shared across workers.
+    Entries live in a per-process TTLCache (bounded LRU with per-entry TTL) and,
+    when Redis is configured, are also written to Redis so other workers can reuse them.
+    """
+    def __init__(self, namespace: str, cost):
+        self.namespace = namespace.encode() + b":"
+        self.local = ValueAwareTTLCache(maxsize=CACHE_MAXSIZE, ttl=CACHE_TTL, cost=cost)
+
+    async def get(self, key: bytes):
+        """
+        Look up a cached value, falling back to Redis on a local miss.
+        Returns:
+            The cached value, or None if absent or expired.
+        """
+        value = self.local.get(key)
+        if value is not None or redis_client is None:
+            return value
+        try:
+            raw = await redis_client.get(self.namespace + key)
+        except Exception as e:
+            logger.warning("Redis get failed, treating as cache miss: %s", e)
+            return None
+        return orjson.loads(raw) if raw is not None else None
+
+    async def set(self, key: bytes, value):
+        """
+        Store a value locally and, when configured, in Redis with the same TTL.
+        """
+        self.local[key] = value
+        if redis_client is None:
+            return
+        try:
+            await redis_client.set(self.namespace + key, orjson.dumps(value), ex=CACHE_TTL)
+        except Exception as e:
+            logger.warning("Redis set failed, value cached for this worker only: %s", e)
+
+    async def get_many(self, keys) -> dict:
+        """
+        Look up several keys at once, fetching local misses from Redis in one MGET.
+        Args:
+            keys: String keys (e.g., symbols).
+        Returns:
+            Dictionary mapping each key found in the cache to its value.
+        """
+        found = {}
+        missing = []
+        for key in keys:
+            value = self.local.get(key)
+            if value is None:
+                missing.append(key)
+            else:
+                found[key] = value
+        if not missing or redis_client is None:
+            return found
+        try:
+            raws = await redis_client.mget([self.namespace + key.encode() for key in missing])
+        except Exception as e:
+            logger.warning("Redis mget failed, treating as cache misses: %s", e)
+            return found
+        for key, raw in zip(missing, raws):
+            if raw is not None:
+                found[key] = orjson.loads(raw)
+        return found
+
+    async def set_many(self, values: dict):
+        """
+        Store several string-keyed values locally and, when configured, in Redis
+        through a single pipeline.
+        """
+        self.local.update(values)
+        if redis_client is None or not values:
+            return
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for key, value in values.items():
+                    pipe.set(self.namespace + key.encode(), orjson.dumps(value), ex=CACHE_TTL)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("Redis pipeline set failed, values cached for this worker only: %s", e)
+
+# Keyed per symbol so overlapping symbol sets share quotes; every entry covers one symbol
+stock_cache = SharedCache("quotes", cost=lambda quote: 1)
+volume_cache = SharedCache("volumes", cost=len)  # symbol -> (bought, sold) per symbol set
+# (symbol count, serialized update_quotes body) per symbol set
+response_cache = ValueAwareTTLCache(maxsize=CACHE_MAXSIZE, ttl=CACHE_TTL, cost=operator.itemgetter(0))
+inflight = {}  # In-flight upstream fetches keyed by cache key, shared by concurrent requests
+
+def normalize_symbols(symbols) -> list:
+    """
+    Normalize requested symbols once at the entry point.
+    Args:
+        symbols: Symbols as sent by the client.
+    Returns:
+        Sorted list of unique, stripped, upper-cased symbols; entries that are not
+        well-formed tickers are dropped so they never reach the cache or upstream.
+    """
+    if not isinstance(symbols, list):
+        return []
+    normalized = {s.strip().upper() for s in symbols if isinstance(s, str)}
+    return sorted(s for s in normalized if SYMBOL_PATTERN.match(s))
+
+def symbols_cache_key(symbols) -> bytes:
+    """
+    Build a fixed-size cache key for a set of symbols.
+    Args:
+        symbols: Symbols as returned by normalize_symbols (already sorted and deduplicated).
+    Returns:
+        16-byte BLAKE2b digest of the comma-joined symbols.
+    """
+    return hashlib.blake2b(",".join(symbols).encode(), digest_size=16).digest()
+
+async def single_flight(key, fetch):
+    """
+    Run an upstream fetch once per key, letting concurrent callers share the result.
+    Args:
+        key: Hashable identifier of the fetch (e.g., ("quotes", cache_key)).
+        fetch: Zero-argument coroutine function performing the upstream call.
+    Returns:
+        The result of fetch().
+    """
+    task = inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(fetch())
+        inflight[key] = task
+        task.add_done_callback(lambda _: inflight.pop(key, None))
+    else:
+        logger.debug("Joining in-flight fetch for %s", key)
+    # Shield so a disconnecting client does not cancel the fetch for the others
+    return await asyncio.shield(task)
+
+# Micro-batching state for screen_stocks
+pending_symbols = set()  # Union of symbols requested during the current batch window
+pending_waiters = []  # (requested symbols, future) for each caller in the current window
+batch_task = None  # Task flushing the current window, if one is scheduled
+
+async def batched_screen_stocks(symbols):
+    """
+    Fetch quotes through a short batching window so concurrent requests with
+    overlapping symbol sets share a single upstream screen_stocks call.
+    Args:
+        symbols: List of stock symbols.
+    Returns:
+        Dictionary mapping each requested symbol to its quote dict.
+    """
+    global batch_task
+    future = asyncio.get_running_loop().create_future()
+    pending_symbols.update(symbols)
+    pending_waiters.append((symbols, future))
+    if batch_task is None:
+        batch_task = asyncio.create_task(flush_screen_batch())
+    return await future
+
+async def flush_screen_batch():
+    """
+    Wait for the batching window to close, then issue one upstream call for the
+    union of pending symbols and hand each caller its own subset.
+    """
+    global batch_task
+    await asyncio.sleep(BATCH_WINDOW)
+    symbols = sorted(pending_symbols)
+    waiters = pending_waiters[:]
+    pending_symbols.clear()
+    pending_waiters.clear()
+    batch_task = None
+
+    logger.debug("Flushing quote batch of %s symbols for %s requests", len(symbols), len(waiters))
+    try:
+        quotes = await get_market_data().screen_stocks(symbols)
+    except Exception as e:
+        for _, future in waiters:
+            if not future.done():
+                future.set_exception(e)
+        return
+
+    for requested, future in waiters:
+        if not future.done():
+            future.set_result({symbol: quotes[symbol] for symbol in requested if symbol in quotes})
+
+async def parse_json_body(request: Request):
+    """
+    Read and parse the request body with orjson.
+    Large bodies are parsed in the default executor to keep the event loop responsive.
+    Raises:
+        HTTPException (413) if the body is too large, (400) if it is not valid JSON.
+    """
+    # Reject oversize payloads before reading them when the client declares the length
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_BODY_BYTES:
+        raise HTTPException(status_code=413, detail="Request body too large")
+    raw_data = await request.body()
+    if len(raw_data) > MAX_BODY_BYTES:
+        raise HTTPException(status_code=413, detail="Request body too large")
+    # Only decode the raw body when it will actually be logged
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Raw request body: %s", raw_data.decode('utf-8', errors='replace'))
+    try:
+        if len(raw_data) > JSON_OFFLOAD_THRESHOLD:
+            return await asyncio.get_running_loop().run_in_executor(None, orjson.loads, raw_data)
+        return orjson.loads(raw_data)
+    except orjson.JSONDecodeError as e:
+        logger.error("Failed to parse JSON request body: %s", e)
+        raise HTTPException(status_code=400, detail="Invalid JSON format in request body")
 
 def rate_limit(client_ip: str):
     """
-    Enforce rate limiting based on client IP.
+    Enforce rate limiting based on client IP using a token bucket.
+    Buckets are refilled lazily on access, so only the caller's entry is touched.
     Args:
         client_ip: The client's IP address.
     Returns:
         Tuple of (allowed: bool, error_message: str or None).
     """
     current_time = time.time()
-    # Clean up old entries
-    for ip in list(request_counts.keys()):
-        if current_time - request_counts[ip][1] > 60:
-            del request_counts[ip]
-    
-    if client_ip in request_counts:
-        count, timestamp = request_counts[client_ip]
-        if current_time - timestamp < 60:
-            if count >= MAX_REQUESTS_PER_MINUTE:
-                return False, "Rate limit exceeded. Please try again later."
-            request_counts[client_ip] = (count + 1, timestamp)
-        else:
-            request_counts[client_ip] = (1, current_time)
-    else:
-        request_counts[client_ip] = (1, current_time)
+    bucket = request_counts.get(client_ip)
+    if bucket is None:
+        request_counts[client_ip] = [RATE_LIMIT_CAPACITY - 1, current_time]
+        return True, None
+
+    tokens = min(RATE_LIMIT_CAPACITY, bucket[0] + (current_time - bucket[1]) * RATE_LIMIT_REFILL_RATE)
+    bucket[1] = current_time
+    if tokens < 1:
+        bucket[0] = tokens
+        return False, "Rate limit exceeded. Please try again later."
+    bucket[0] = tokens - 1
     return True, None
 
-@app.post("/api/update_quotes")
-async def update_quotes(request: Request):
+async def sweep_rate_limits():
     """
-    Fetch updated price, volume, and change percentage for a list of symbols with caching.
+    Periodically drop buckets that have refilled completely.
+    A full bucket behaves exactly like a missing one, so removing it is lossless.
     """
-    try:
-        # Rate limiting
-        client_ip = request.client.host
-        allowed, error_message = rate_limit(client_ip)
-        if not allowed:
-            logger.warning(f"Rate limit exceeded for client {client_ip}")
-            raise HTTPException(status_code=429, detail=error_message)
-
-        # Log the raw request body for debugging
-        raw_data = await request.body()
-        logger.debug(f"Raw request body: {raw_data.decode('utf-8')}")
-
-        # Parse the request body as JSON
-        data = await request.json()
-        if not isinstance(data, dict):
-            logger.error(f"Request body is not a valid JSON object: {data}")
-            raise HTTPException(status_code=400, detail="Invalid JSON: Request body must be a JSON object")
-
-        logger.debug(f"Received update quotes request: {data}")
-        symbols = data.get('symbols', [])
-        force_refresh = data.get('force_refresh', False)
-
-        # Validate the number of symbols
-        if not symbols:
-            raise HTTPException(status_code=400, detail="No symbols provided")
-        if len(symbols) > MAX_SYMBOLS:
-            logger.warning(f"Too many symbols requested: {len(symbols)} by client {client_ip}")
-            raise HTTPException(status_code=400, detail=f"Too many symbols. Maximum allowed is {MAX_SYMBOLS}")
-
+    while True:
+        await asyncio.sleep(RATE_LIMIT_SWEEP_INTERVAL)
         current_time = time.time()
-        # Check cache for existing stock data
-        cache_key = ",".join(sorted(symbols))
-        if not force_refresh and cache_key in stock_cache:
-            cached_data = stock_cache[cache_key]
-            if current_time - cached_data["timestamp"] < CACHE_TTL:
-                logger.debug(f"Returning cached stock data for symbols: {cache_key}")
-                updated_quotes = cached_data["data"]
-            else:
-                logger.debug(f"Cache expired for symbols: {cache_key}")
-                del stock_cache[cache_key]
-                updated_quotes = []
-        else:
-            updated_quotes = []
+        for ip in list(request_counts.keys()):
+            tokens, last_refill = request_counts[ip]
+            if tokens + (current_time - last_refill) * RATE_LIMIT_REFILL_RATE >= RATE_LIMIT_CAPACITY:
+                del request_counts[ip]
 
-        # Fetch updated quotes if not in cache or force_refresh is True
-        if not updated_quotes:
-            start_time = time.time()
-            updated_quotes = await market_data.screen_stocks(symbols)
-            logger.debug(f"screen_stocks took {time.time() - start_time:.2f} seconds")
-            if not updated_quotes:
-                logger.error("Failed to fetch updated quotes from MarketData")
-                raise HTTPException(status_code=500, detail="Failed to fetch updated quotes")
-            # Cache the raw stock data
-            stock_cache[cache_key] = {
-                "data": updated_quotes,
-                "timestamp": current_time
-            }
-
-        # Validate updated_quotes: ensure it's a list of tuples with 8 elements
-        validated_quotes = []
-        for quote in updated_quotes:
-            if not isinstance(quote, tuple):
-                logger.warning(f"Invalid quote entry (not a tuple): {quote}")
-                continue
-            if len(quote) != 8:  # Updated to expect 8 elements
-                logger.warning(f"Invalid quote tuple (wrong length, expected 8): {quote}")
-                continue
-            if not isinstance(quote[0], str):
-                logger.warning(f"Invalid quote tuple (symbol is not a string): {quote}")
-                continue
-            validated_quotes.append(quote)
-
-        if not validated_quotes:
-            logger.warning("No valid quotes after validation.")
-            return {}
-
-        # Prepare bid/ask data to pass to get_buy_sell_volume
-        bid_ask_data = {quote[0]: (quote[5], quote[6]) for quote in validated_quotes}
-        symbols_to_fetch = [quote[0] for quote in validated_quotes]
-
-        # Check cache for buy/sell volumes
-        volume_cache_key = ",".join(sorted(symbols_to_fetch))
-        if not force_refresh and volume_cache_key in volume_cache:
-            cached_volumes = volume_cache[volume_cache_key]
-            if current_time - cached_volumes["timestamp"] < CACHE_TTL:
-                logger.debug(f"Returning cached buy/sell volumes for symbols: {volume_cache_key}")
-                buy_sell_volumes = cached_volumes["data"]
-            else:
-                logger.debug(f"Volume cache expired for symbols: {volume_cache_key}")
-                del volume_cache[volume_cache_key]
-                buy_sell_volumes = None
-        else:
-            buy_sell_volumes = None
-
-        # Fetch buy/sell volumes if not in cache or force_refresh is True
+@app.exception_handler(HTTPException)
+async def http_exception_handler(request: Request, exc: HTTPException):
+    """
+    Render error responses with orjson, matching the default response class.
+    """
+    return ORJSONResponse({"detail": exc.detail}, status_code=exc.status_code, headers=exc.headers)
+
+@app.on_event("startup")
+async def start_background_tasks():
+    app.state.rate_limit_sweeper = asyncio.create_task(sweep_rate_limits())
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    app.state.rate_limit_sweeper.cancel()
+    if get_market_data.cache_info().currsize:
+        await get_market_data().close()
+    if redis_client is not None:
+        await redis_client.aclose()
+    log_listener.stop()
+
+async def read_symbols_request(request: Request, request_name: str):
+    """
+    Apply rate limiting, parse the JSON body and extract the requested symbols.
+    Args:
+        request: Incoming request.
+        request_name: Human-readable endpoint name used in log messages.
+    Returns:
+        Tuple of (parsed body dict, normalized symbol list).
+    Raises:
+        HTTPException (429 or 400) if the request is rate limited or invalid.
+    """
+    # Rate limiting
+    client_ip = request.client.host
+    allowed, error_message = rate_limit(client_ip)
+    if not allowed:
+        logger.warning("Rate limit exceeded for client %s", client_ip)
+        raise HTTPException(status_code=429, detail=error_message)
+
+    # Parse the request body as JSON
+    data = await parse_json_body(request)
+    if not isinstance(data, dict):
+        logger.error("Request body is not a valid JSON object: %s", data)
+        raise HTTPException(status_code=400, detail="Invalid JSON: Request body must be a JSON object")
+
+    logger.debug("Received %s request: %s", request_name, data)
+    symbols = normalize_symbols(data.get('symbols', []))
+
+    # Validate the number of symbols
+    if not symbols:
+        raise HTTPException(status_code=400, detail="No valid symbols provided")
+    if len(symbols) > MAX_SYMBOLS:
+        logger.warning("Too many symbols requested: %s by client %s", len(symbols), client_ip)
+        raise HTTPException(status_code=400, detail=f"Too many symbols. Maximum allowed is {MAX_SYMBOLS}")
+    return data, symbols
+
+async def _handle_quote_request(symbols, force_refresh):
+    """
+    Assemble quotes with inferred buy/sell volumes, using the caches where possible.
+    Args:
+        symbols: Normalized symbol list.
+        force_refresh: Bypass cached quotes and volumes when True.
+    Returns:
+        JSON-encoded object mapping each symbol to its price, volume, change percentage,
+        market cap and bought/sold volumes.
+    """
+    # A warm response skips validation, assembly and serialization entirely
+    cache_key = symbols_cache_key(symbols)
+    if not force_refresh:
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return cached[1]
+
+    # Check caches for existing stock data (per symbol) and buy/sell volumes
+    updated_quotes = {} if force_refresh else await stock_cache.get_many(symbols)
+    buy_sell_volumes = None if force_refresh else await volume_cache.get(cache_key)
+    missing_symbols = [symbol for symbol in symbols if symbol not in updated_quotes]
+    if updated_quotes:
+        logger.debug("Using cached stock data for %s of %s symbols", len(updated_quotes), len(symbols))
+    if buy_sell_volumes is not None:
+        logger.debug("Returning cached buy/sell volumes for symbols: %s", symbols)
+
+    # Fetch quotes only for symbols missing from the cache. The raw volume inputs do
+    # not depend on the quotes, so fetch them concurrently when both are needed.
+    raw_volumes = None
+    if missing_symbols:
+        # Only read the clock when the timing will actually be logged
+        timed = logger.isEnabledFor(logging.DEBUG)
+        start_time = time.time() if timed else 0.0
+        quotes_fetch = single_flight(
+            ("quotes", symbols_cache_key(missing_symbols)),
+            lambda: batched_screen_stocks(missing_symbols)
+        )
         if buy_sell_volumes is None:
-            start_time = time.time()
-            buy_sell_volumes = await market_data.get_buy_sell_volume(
-                symbols=symbols_to_fetch,
-                bid_ask_data=bid_ask_data,
-                force_refresh=force_refresh
+            fresh_quotes, raw_volumes = await asyncio.gather(
+                quotes_fetch,
+                single_flight(
+                    ("raw_volumes", cache_key),
+                    lambda: get_market_data().fetch_raw_volumes(symbols)
+                )
             )
-            logger.debug(f"get_buy_sell_volume took {time.time() - start_time:.2f} seconds")
-            if buy_sell_volumes is None:
-                logger.error("Failed to fetch buy/sell volumes from MarketData")
-                buy_sell_volumes = {symbol: (0, 0) for symbol in symbols_to_fetch}
-            # Cache the volumes
-            volume_cache[volume_cache_key] = {
-                "data": buy_sell_volumes,
-                "timestamp": current_time
-            }
-
-        # Format the response as a dictionary for easier lookup in the frontend
-        quote_data = {}
-        for quote in validated_quotes:
-            symbol = quote[0]
-            buy_volume, sell_volume = buy_sell_volumes.get(symbol, (0, 0))
-            quote_data[symbol] = {
-                "price": quote[1],
-                "volume": quote[3],
-                "change_percentage": quote[4],
-                "market_cap": quote[7],  # Added market cap
-                "volume_bought": buy_volume,
-                "volume_sold": sell_volume
-            }
-
-        # Clean up old cache entries
-        for key in list(stock_cache.keys()):
-            if current_time - stock_cache[key]["timestamp"] >= CACHE_TTL:
-                del stock_cache[key]
-        for key in list(volume_cache.keys()):
-            if current_time - volume_cache[key]["timestamp"] >= CACHE_TTL:
-                del volume_cache[key]
-
-        return quote_data
-    except ValueError as ve:
-        logger.error(f"Failed to parse JSON request body: {str(ve)}")
-        raise HTTPException(status_code=400, detail="Invalid JSON format in request body")
+        else:
+            fresh_quotes = await quotes_fetch
+        if timed:
+            logger.debug("Upstream fetch took %.2f seconds", time.time() - start_time)
+        if fresh_quotes:
+            # Cache the raw stock data per symbol
+            await stock_cache.set_many(fresh_quotes)
+            updated_quotes.update(fresh_quotes)
+        if not updated_quotes:
+            logger.error("Failed to fetch updated quotes from MarketData")
+            raise HTTPException(status_code=500, detail="Failed to fetch updated quotes")
+
+    # Validate updated_quotes and collect the inputs for buy/sell inference in one pass
+    validated_quotes = {}
+    bid_ask_data = {}
+    total_volumes = {}
+    symbols_to_fetch = []
+    for symbol, quote in updated_quotes.items():
+        if not (isinstance(symbol, str) and isinstance(quote, dict) and QUOTE_FIELDS <= quote.keys()):
+            logger.warning("Invalid quote entry for %s: %s", symbol, quote)
+            continue
+        validated_quotes[symbol] = quote
+        bid_ask_data[symbol] = (quote["bid"], quote["ask"])
+        total_volumes[symbol] = quote["volume"]
+        symbols_to_fetch.append(symbol)
+
+    if not validated_quotes:
+        logger.warning("No valid quotes after validation.")
+        return b"{}"
+
+    # Infer buy/sell volumes if not in cache or force_refresh is True
+    if buy_sell_volumes is None:
+        if raw_volumes is None:
+            # Key the flight on the symbols actually fetched, which can be a subset of symbols
+            symbols_to_fetch.sort()
+            raw_volumes = await single_flight(
+                ("raw_volumes", symbols_cache_key(symbols_to_fetch)),
+                lambda: get_market_data().fetch_raw_volumes(symbols_to_fetch)
+            )
+        buy_sell_volumes = get_market_data().compute_buy_sell(symbols_to_fetch, raw_volumes, bid_ask_data, total_volumes)
+        # Cache the volumes
+        await volume_cache.set(cache_key, buy_sell_volumes)
+
+    # Format the response as a dictionary for easier lookup in the frontend
+    # (the inner single-item loop binds each symbol's buy/sell pair once)
+    quote_data = {
+        symbol: {
+            "price": quote["price"],
+            "volume": quote["volume"],
+            "change_percentage": quote["change_percentage"],
+            "market_cap": quote["market_cap"],
+            "volume_bought": volumes[0],
+            "volume_sold": volumes[1]
+        }
+        for symbol, quote in validated_quotes.items()
+        for volumes in (buy_sell_volumes.get(symbol, (0, 0)),)
+    }
+
+    body = orjson.dumps(quote_data)
+    response_cache[cache_key] = (len(quote_data), body)
+    return body
+
+async def _handle_screen_request(symbols):
+    """
+    Fetch basic stock data for the screener.
+    Args:
+        symbols: Normalized symbol list.
+    Returns:
+        List of stock dicts, one per symbol with a complete quote.
+    """
+    # Fetch stock data using MarketData.screen_stocks
+    timed = logger.isEnabledFor(logging.DEBUG)
+    start_time = time.time() if timed else 0.0
+    stock_data = await single_flight(
+        ("quotes", symbols_cache_key(symbols)),
+        lambda: batched_screen_stocks(symbols)
+    )
+    if timed:
+        logger.debug("screen_stocks took %.2f seconds", time.time() - start_time)
+
+    if not stock_data:
+        logger.error("Failed to fetch stock data from MarketData")
+        raise HTTPException(status_code=500, detail="Failed to fetch stock data")
+
+    # Validate the stock data: ensure every symbol maps to a complete quote dict
+    validated_stocks = {}
+    for symbol, stock in stock_data.items():
+        if not (isinstance(symbol, str) and isinstance(stock, dict) and QUOTE_FIELDS <= stock.keys()):
+            logger.warning("Invalid stock entry for %s: %s", symbol, stock)
+            continue
+        validated_stocks[symbol] = stock
+
+    if not validated_stocks:
+        logger.warning("No valid stock data after validation.")
+        return []
+
+    # Format the response as a list of dictionaries for the frontend
+    stock_list = [
+        {
+            "symbol": symbol,
+            "price": stock["price"],
+            "change": stock["change"],
+            "volume": stock["volume"],
+            "change_percentage": stock["change_percentage"],
+            "bid": stock["bid"],
+            "ask": stock["ask"],
+            "market_cap": stock["market_cap"]
+        }
+        for symbol, stock in validated_stocks.items()
+    ]
+
+    return stock_list
+
+def json_body_response(body: bytes) -> Response:
+    """
+    Wrap a serialized JSON body with a short Cache-Control header.
+    """
+    return Response(content=body, media_type="application/json",
+                    headers={"Cache-Control": f"public, max-age={CACHE_TTL}"})
+
+@app.post("/api/update_quotes")
+async def update_quotes(request: Request):
+    """
+    Fetch updated price, volume, and change percentage for a list of symbols with caching.
+    """
+    try:
+        data, symbols = await read_symbols_request(request, "update quotes")
+        body = await _handle_quote_request(symbols, data.get('force_refresh', False))
+        return json_body_response(body)
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error in update_quotes: {str(e)}", exc_info=True)
+        logger.error("Error in update_quotes: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @app.post("/api/screen")
@@ -211,83 +585,119 @@ async def screen_stocks(request: Request):
     Screen stocks based on a list of symbols and return basic stock data.
     """
     try:
-        # Rate limiting
-        client_ip = request.client.host
-        allowed, error_message = rate_limit(client_ip)
-        if not allowed:
-            logger.warning(f"Rate limit exceeded for client {client_ip}")
-            raise HTTPException(status_code=429, detail=error_message)
-
-        # Log the raw request body for debugging
-        raw_data = await request.body()
-        logger.debug(f"Raw request body: {raw_data.decode('utf-8')}")
-
-        # Parse the request body as JSON
-        data = await request.json()
-        if not isinstance(data, dict):
-            logger.error(f"Request body is not a valid JSON object: {data}")
-            raise HTTPException(status_code=400, detail="Invalid JSON: Request body must be a JSON object")
-
-        logger.debug(f"Received screen stocks request: {data}")
-        symbols = data.get('symbols', [])
-
-        # Validate the number of symbols
-        if not symbols:
-            raise HTTPException(status_code=400, detail="No symbols provided")
-        if len(symbols) > MAX_SYMBOLS:
-            logger.warning(f"Too many symbols requested: {len(symbols)} by client {client_ip}")
-            raise HTTPException(status_code=400, detail=f"Too many symbols. Maximum allowed is {MAX_SYMBOLS}")
-
-        # Fetch stock data using MarketData.screen_stocks
-        start_time = time.time()
-        stock_data = await market_data.screen_stocks(symbols)
-        logger.debug(f"screen_stocks took {time.time() - start_time:.2f} seconds")
-
-        if not stock_data:
-            logger.error("Failed to fetch stock data from MarketData")
-            raise HTTPException(status_code=500, detail="Failed to fetch stock data")
-
-        # Validate the stock data: ensure it's a list of tuples with 8 elements
-        validated_stocks = []
-        for stock in stock_data:
-            if not isinstance(stock, tuple):
-                logger.warning(f"Invalid stock entry (not a tuple): {stock}")
-                continue
-            if len(stock) != 8:  # Updated to expect 8 elements
-                logger.warning(f"Invalid stock tuple (wrong length, expected 8): {stock}")
+        data, symbols = await read_symbols_request(request, "screen stocks")
+        return json_body_response(orjson.dumps(await _handle_screen_request(symbols)))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error in screen_stocks: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@app.websocket("/ws/quotes")
+async def quotes_socket(websocket: WebSocket):
+    """
+    Push quote updates to a subscribed client instead of having it poll.
+    The client sends {"subscribe": [symbols]} whenever its symbol set changes or it needs
+    a resync; the first push after a subscribe is a full snapshot, then every
+    QUOTE_PUSH_INTERVAL seconds the server sends the quotes (same shape as
+    /api/update_quotes) that changed since the previous push.
+    Connecting and every subscribe message draw from the client's rate-limit bucket;
+    a rate-limited or oversized subscription closes the socket with a policy-violation code.
+    """
+    client_ip = websocket.client.host
+    allowed, _ = rate_limit(client_ip)
+    if not allowed:
+        logger.warning("Rate limit exceeded for WebSocket client %s", client_ip)
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+    symbols = []
+    subscribed = asyncio.Event()
+
+    async def read_subscriptions():
+        nonlocal symbols
+        # Returning ends the push loop below
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            text = message.get("text")
+            if text is None:
+                # Subscriptions are JSON text frames; anything else is a protocol misuse
+                logger.warning("Closing WebSocket from %s after a non-text frame", client_ip)
+                await websocket.close(code=1008, reason="Expected a text frame")
+                return
+            try:
+                data = orjson.loads(text)
+            except orjson.JSONDecodeError:
+                logger.warning("Ignoring malformed WebSocket message")
                 continue
-            if not isinstance(stock[0], str):
-                logger.warning(f"Invalid stock tuple (symbol is not a string): {stock}")
+            if isinstance(data, dict) and isinstance(data.get("subscribe"), list):
+                allowed, _ = rate_limit(client_ip)
+                if not allowed:
+                    logger.warning("Rate limit exceeded for WebSocket client %s", client_ip)
+                    await websocket.close(code=1008, reason="Rate limit exceeded")
+                    return
+                requested = normalize_symbols(data["subscribe"])
+                if len(requested) > MAX_SUBSCRIBED_SYMBOLS:
+                    logger.warning("Too many symbols subscribed: %s by client %s", len(requested), client_ip)
+                    await websocket.close(
+                        code=1008, reason=f"Too many symbols. Maximum allowed is {MAX_SUBSCRIBED_SYMBOLS}"
+                    )
+                    return
+                symbols = requested
+                logger.debug("WebSocket subscribed to %s symbols", len(symbols))
+                subscribed.set()
+
+    reader = asyncio.create_task(read_subscriptions())
+    last_sent = {}
+    try:
+        while not reader.done():
+            # Push right away on a new subscription, otherwise once per interval
+            try:
+                await asyncio.wait_for(subscribed.wait(), timeout=QUOTE_PUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            if reader.done():
+                # The reader closed the socket or saw a disconnect while we waited
+                break
+            if subscribed.is_set():
+                # A (re)subscribe asks for a full snapshot, not just deltas
+                last_sent.clear()
+                subscribed.clear()
+            # Snapshot the subscription; the reader may rebind it while this push awaits
+            current = symbols
+            if not current:
                 continue
-            validated_stocks.append(stock)
-
-        if not validated_stocks:
-            logger.warning("No valid stock data after validation.")
-            return []
-
-        # Format the response as a list of dictionaries for the frontend
-        stock_list = [
-            {
-                "symbol": stock[0],
-                "price": stock[1],
-                "change": stock[2],
-                "volume": stock[3],
-                "change_percentage": stock[4],
-                "bid": stock[5],
-                "ask": stock[6],
-                "market_cap": stock[7]  # Added market cap
-            }
-            for stock in validated_stocks
-        ]
-
-        return stock_list
-    except ValueError as ve:
-        logger.error(f"Failed to parse JSON request body: {str(ve)}")
-        raise HTTPException(status_code=400, detail="Invalid JSON format in request body")
+
+            quotes = {}
+            # Same chunking as the polling client, so both share cached responses
+            for start in range(0, len(current), MAX_SYMBOLS):
+                try:
+                    body = await _handle_quote_request(current[start:start + MAX_SYMBOLS], False)
+                except HTTPException as e:
+                    logger.warning("Skipping quote push: %s", e.detail)
+                    continue
+                quotes.update(orjson.loads(body))
+
+            changed = {symbol: quote for symbol, quote in quotes.items() if last_sent.get(symbol) != quote}
+            if changed:
+                await websocket.send_text(orjson.dumps(changed).decode())
+                last_sent.update(changed)
+    except WebSocketDisconnect:
+        pass
     except Exception as e:
-        logger.error(f"Error in screen_stocks: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail="Internal server error")
+        logger.error("Error in quotes_socket: %s", e, exc_info=True)
+    finally:
+        reader.cancel()
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host=Config.FLASK_HOST, port=Config.FLASK_PORT)
\ No newline at end of file
+    # uvicorn picks uvloop and httptools automatically when installed (uvicorn[standard])
+    uvicorn.run(
+        "app:app",
+        host=Config.FLASK_HOST,
+        port=Config.FLASK_PORT,
+        workers=Config.SERVER_WORKERS,
+        reload=Config.FLASK_DEBUG
+    )
\ No newline at end of file
@@ -5,83 +5,301 @@ from PySide6.QtWidgets import (
     QLabel, 
     QStyledItemDelegate, 
     QPushButton, 
-    QTableWidgetItem, 
     QHeaderView, 
     QProgressBar, 
     QInputDialog, 
     QMessageBox, 
     QScrollArea
 )
-from PySide6.QtCore import Qt, QThread, Signal, Slot, QTimer, QRect
-from PySide6.QtGui import QIcon, QPen, QColor
+from PySide6.QtCore import (
+    Qt, QObject, QThread, QRunnable, QThreadPool, Signal, Slot, QTimer, QRect, QAbstractTableModel, QModelIndex
+)
+from PySide6.QtGui import QIcon, QPen, QBrush, QColor, QPainter, QPixmap
+from PySide6.QtWebSockets import QWebSocket
 
+import functools
 import json
+import operator
+import re
 import os
 import logging
+import orjson
 import requests
-import threading
 import time
 from datetime import datetime, timedelta
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
 from flask_app.config import Config
-from components.screener.table_edit import TableEdit, CustomTableWidget
+from components.screener.table_edit import TableEdit, CustomTableView
 
 logger = logging.getLogger(__name__)
 
+MAX_SYMBOLS_PER_REQUEST = 50  # Backend limit on symbols per /api/update_quotes call
+POLL_INTERVAL_MS = 15000  # Quote polling interval, used while the quote socket is down
+QUOTE_SOCKET_URL = "ws://127.0.0.1:5000/ws/quotes"
+SOCKET_RECONNECT_MS = 30000  # Delay before retrying a dropped quote socket
+SCREEN_CACHE_TTL = 60  # Seconds an /api/screen response is reused for the same symbols
+PRICE_TOLERANCE = 1e-4  # Price moves smaller than this don't count as a change
+CHANGE_TOLERANCE = 1e-3  # Same for change percentage (displayed with two decimals)
+SCREEN_CACHE_MAXSIZE = 64  # Distinct symbol sets kept before the screen cache is cleared
+SAVE_DEBOUNCE_MS = 500  # Coalescing window for screener list writes
+# (connect, read) seconds: a dead backend fails fast, a slow upstream fetch still has room
+REQUEST_TIMEOUT = (2, 30)
+START_UPDATE_DEBOUNCE_MS = 250  # Coalescing window for list refreshes triggered by edits
+MAX_WORKER_THREADS = 2  # Concurrent add-stock/start-update requests
+SCREENER_LISTS_PATH = "json/screener_lists.json"
+DEFAULT_SYMBOLS = ("AAPL", "MSFT", "GOOGL")  # Seed for the default list when none are saved
+# Same rule as the backend's SYMBOL_PATTERN, so bad input never costs a round trip
+SYMBOL_PATTERN = re.compile(r"^[A-Z]{1,5}(\.[A-Z])?$")
+
+@functools.lru_cache(maxsize=4096)
+def format_market_cap(market_cap_billions):
+    """
+    Format market cap (in billions) to abbreviated form (T, B, M).
+    Results are memoized since most values repeat between refreshes.
+    Args:
+        market_cap_billions: Market capitalization in billions.
+    Returns:
+        Formatted string (e.g., '3.11T', '500B', '500M').
+    """
+    if market_cap_billions >= 1000:
+        return f"{market_cap_billions / 1000:.2f}T"  # Trillions
+    elif market_cap_billions >= 1:
+        return f"{market_cap_billions:.2f}B"  # Billions
+    else:
+        return f"{market_cap_billions * 1000:.0f}M"  # Millions
+
+@functools.lru_cache(maxsize=4096)
+def format_volume(volume):
+    """
+    Format a share volume with thousands separators (memoized).
+    """
+    return f"{int(volume):,}"
+
+def rows_changed(old_rows, new_rows):
+    """
+    Whether new_rows differ meaningfully from old_rows: price and change percentage
+    are compared with a tolerance, everything else exactly.
+    """
+    if old_rows == new_rows:
+        return False
+    if len(old_rows) != len(new_rows):
+        return True
+    for old, new in zip(old_rows, new_rows):
+        if old == new:
+            continue
+        if (
+            len(old) != len(new)
+            or old[0] != new[0]
+            or abs(old[1] - new[1]) > PRICE_TOLERANCE
+            or abs(old[2] - new[2]) > CHANGE_TOLERANCE
+            or old[3:] != new[3:]
+        ):
+            return True
+    return False
+
+def quote_row(symbol, data):
+    """
+    Build a table row from an /api/update_quotes (or /ws/quotes) entry.
+    The trailing up - down net volume is precomputed as the Up/Down sort key.
+    """
+    up_volume = data["volume_bought"]
+    down_volume = data["volume_sold"]
+    return (
+        symbol,
+        data["price"],
+        data["change_percentage"],
+        data.get("market_cap", 0),
+        data["volume"],
+        up_volume,
+        down_volume,
+        up_volume - down_volume
+    )
+
 class UpDownDelegate(QStyledItemDelegate):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.max_combined_volume = 1
+        self._bg_cache = {}  # (width, height) -> pre-rendered background and center line
+        # Bars are filled with fillRect, so paint() never touches pen/brush state
+        self._up_brush = QBrush(QColor(Qt.green))
+        self._down_brush = QBrush(QColor(Qt.red))
+        self._center_pen = QPen(Qt.black, 1)
 
     def set_max_combined_volume(self, max_volume):
         self.max_combined_volume = max(1, max_volume)
 
+    def _background(self, width, height):
+        key = (width, height)
+        pixmap = self._bg_cache.get(key)
+        if pixmap is None:
+            if len(self._bg_cache) >= 32:  # Column resizes produce new sizes; keep the cache small
+                self._bg_cache.clear()
+            pixmap = QPixmap(width, height)
+            pixmap.fill(QColor("#2E3440"))
+            pixmap_painter = QPainter(pixmap)
+            pixmap_painter.setPen(self._center_pen)
+            center_x = (width - 1) // 2
+            pixmap_painter.drawLine(center_x, 5, center_x, height - 6)
+            pixmap_painter.end()
+            self._bg_cache[key] = pixmap
+        return pixmap
+
     def paint(self, painter, option, index):
         up_volume = index.data(Qt.UserRole) or 0
         down_volume = index.data(Qt.UserRole + 1) or 0
 
-        painter.fillRect(option.rect, QColor("#2E3440"))
-
-        rect = option.rect.adjusted(5, 5, -5, -5)
-        total_width = rect.width()
-        center_x = rect.center().x()
-        height = rect.height()
+        cell = option.rect
+        painter.drawPixmap(cell.topLeft(), self._background(cell.width(), cell.height()))
 
-        max_length = total_width / 2
-        up_length = (up_volume / self.max_combined_volume) * max_length
-        down_length = (down_volume / self.max_combined_volume) * max_length
-
-        painter.setPen(QPen(Qt.black, 1))
-        painter.drawLine(center_x, rect.top(), center_x, rect.bottom())
+        top = cell.top() + 5
+        height = cell.height() - 10
+        center_x = cell.left() + (cell.width() - 1) // 2
+        max_length = (cell.width() - 10) >> 1
 
         if up_volume > 0:
-            painter.setPen(QPen(Qt.NoPen))
-            painter.setBrush(QColor(Qt.green))
             up_rect = QRect(
-                center_x, rect.top(),
-                int(up_length), height
+                center_x, top,
+                int(up_volume * max_length / self.max_combined_volume), height
             )
-            painter.drawRect(up_rect)
+            painter.fillRect(up_rect, self._up_brush)
 
         if down_volume > 0:
-            painter.setPen(QPen(Qt.NoPen))
-            painter.setBrush(QColor(Qt.red))
+            down_length = int(down_volume * max_length / self.max_combined_volume)
             down_rect = QRect(
-                center_x - int(down_length), rect.top(),
-                int(down_length), height
+                center_x - down_length, top,
+                down_length, height
             )
-            painter.drawRect(down_rect)
+            painter.fillRect(down_rect, self._down_brush)
 
     def sizeHint(self, option, index):
         return option.rect.size()
 
+class StockTableModel(QAbstractTableModel):
+    """
+    Table model over a list of stock tuples
+    (symbol, price, change %, market cap, volume, up volume, down volume, up - down).
+    Display strings are formatted once per changed row in set_stocks, so repaints in
+    data() are plain lookups.
+    """
+    HEADERS = [
+        "Symbol",
+        "Price ($)",
+        "Change (%)",
+        "Market Cap",
+        "Volume (Shares)",
+        "Up/Down"
+    ]
+    TOOLTIPS = [
+        "Stock ticker symbol (e.g., AAPL)",
+        "Current stock price in USD",
+        "Daily price change percentage",
+        "Market capitalization (T: trillions, B: billions, M: millions)",
+        "Total trading volume (number of shares)",
+        "Up (green, right) and Down (red, left) volume meter"
+    ]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.stocks = []
+        self.display = []  # Preformatted text columns, parallel to self.stocks
+        # Change % colors, shared by every cell instead of built per data() call
+        self._up_color = QColor(Qt.green)
+        self._down_color = QColor(Qt.red)
+
+    @staticmethod
+    def format_row(stock):
+        return (
+            stock[0],
+            str(stock[1]),
+            f"{stock[2]:.2f}%",
+            format_market_cap(stock[3]),  # Format market cap
+            format_volume(stock[4])  # Format volume with commas
+        )
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.stocks)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        col = index.column()
+        if role == Qt.DisplayRole:
+            return self.display[row][col] if col < 5 else None
+        stock = self.stocks[row]
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        if role == Qt.ForegroundRole and col == 2:
+            if stock[2] > 0:
+                return self._up_color
+            if stock[2] < 0:
+                return self._down_color
+            return None
+        if col == 5:
+            # Up/Down volumes for UpDownDelegate
+            if role == Qt.UserRole:
+                return stock[5]
+            if role == Qt.UserRole + 1:
+                return stock[6]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation != Qt.Horizontal:
+            return None
+        if role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        if role == Qt.ToolTipRole:
+            return self.TOOLTIPS[section]
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        return None
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.isValid():
+            flags |= Qt.ItemIsDragEnabled
+        return flags
+
+    def symbol_at(self, row):
+        return self.stocks[row][0]
+
+    def set_stocks(self, stocks):
+        # Grow or shrink at the tail instead of resetting, so the view keeps its
+        # rows, selection and scroll position when a symbol is added or removed
+        old_count = len(self.stocks)
+        new_count = len(stocks)
+        if new_count > old_count:
+            self.beginInsertRows(QModelIndex(), old_count, new_count - 1)
+            self.stocks.extend(stocks[old_count:])
+            self.display.extend(map(self.format_row, stocks[old_count:]))
+            self.endInsertRows()
+        elif new_count < old_count:
+            self.beginRemoveRows(QModelIndex(), new_count, old_count - 1)
+            del self.stocks[new_count:]
+            del self.display[new_count:]
+            self.endRemoveRows()
+        # Then only signal the span of rows whose data changed
+        changed = [row for row, (old, new) in enumerate(zip(self.stocks, stocks)) if old != new]
+        self.stocks = list(stocks)
+        for row in changed:
+            self.display[row] = self.format_row(stocks[row])
+        if changed:
+            self.dataChanged.emit(
+                self.index(changed[0], 0),
+                self.index(changed[-1], self.columnCount() - 1)
+            )
+
 class ScreenerList:
-    def __init__(self, name, symbols=None, display_order=None):
+    def __init__(self, name, symbols=None, manual_order=None):
         self.name = name
         self.symbols = symbols if symbols is not None else []
-        self.display_order = display_order if display_order is not None else []  # New attribute for display order
+        # User-arranged order (drag and drop), persisted; column sorting never touches it
+        self.manual_order = manual_order if manual_order is not None else []
         self.filtered_stocks = []
         self.sort_column = -1
         self.sort_order = Qt.AscendingOrder
@@ -89,133 +307,141 @@ class ScreenerList:
         self.table_edit = None
         self.loading_bar = None
         self.container_layout = None
-        self.updater = None
+        self._last_render_key = None  # Inputs of the last update_table render
+
+    @property
+    def manual_order(self):
+        return self._manual_order
+
+    @manual_order.setter
+    def manual_order(self, order):
+        self._manual_order = order
+        self._order_index = None
+
+    @property
+    def order_index(self):
+        # symbol -> row map for manual_order, rebuilt when the order is replaced or
+        # grows/shrinks in place (append on add, remove on delete)
+        if self._order_index is None or len(self._order_index) != len(self._manual_order):
+            self._order_index = {symbol: row for row, symbol in enumerate(self._manual_order)}
+        return self._order_index
 
 class StockUpdater(QThread):
     update_data = Signal(ScreenerList, list)
     set_loading_signal = Signal(ScreenerList, bool)
 
-    def __init__(self, parent, screener_list):
+    def __init__(self, parent):
         super().__init__(parent)
         self.parent = parent
-        self.screener_list = screener_list
-        self.running = True
-        # Set up a session with retries
-        self.session = requests.Session()
-        retries = Retry(total=3, backoff_factor=1, status_forcelist=[500, 502, 503, 504])
-        self.session.mount("http://", HTTPAdapter(max_retries=retries))
+        # Reuse the screener's pooled keep-alive session
+        self.session = parent.http
 
     def run(self):
-        while self.running:
-            if not self.screener_list.symbols:
-                time.sleep(1)
-                continue
+        # One polling cycle, started by the screener's poll timer: fetch the union of
+        # every list's symbols, then fan out by list
+        screener_lists = [sl for sl in list(self.parent.screener_lists) if sl.symbols]
+        symbols = sorted(set().union(*(sl.symbols for sl in screener_lists)))
+        if not symbols:
+            return
 
-            try:
-                self.set_loading_signal.emit(self.screener_list, True)
+        try:
+            for screener_list in screener_lists:
+                self.set_loading_signal.emit(screener_list, True)
+            updated_data = {}
+            for start in range(0, len(symbols), MAX_SYMBOLS_PER_REQUEST):
                 response = self.session.post(
                     "http://127.0.0.1:5000/api/update_quotes",
-                    json={"symbols": self.screener_list.symbols, "force_refresh": False},
-                    timeout=30  # Increased timeout to 30 seconds
+                    data=orjson.dumps({"symbols": symbols[start:start + MAX_SYMBOLS_PER_REQUEST], "force_refresh": False}),
+                    timeout=REQUEST_TIMEOUT
                 )
                 response.raise_for_status()
-                updated_data = response.json()
-
-                new_filtered_stocks = []
-                with self.parent.lock:
-                    for symbol in self.screener_list.symbols:
-                        if symbol in updated_data:
-                            data = updated_data[symbol]
-                            new_filtered_stocks.append((
-                                symbol,
-                                data["price"],
-                                data["change_percentage"],
-                                data.get("market_cap", 0),
-                                data["volume"],
-                                data["volume_bought"],
-                                data["volume_sold"]
-                            ))
-                    self.screener_list.filtered_stocks = new_filtered_stocks.copy()
-
-                self.update_data.emit(self.screener_list, new_filtered_stocks)
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Error in StockUpdater for list {self.screener_list.name}: {str(e)}")
-                logger.debug(f"Symbols: {self.screener_list.symbols}")
-            finally:
-                self.set_loading_signal.emit(self.screener_list, False)
-                time.sleep(15)
-
-class StockAdder(QThread):
-    add_stock_finished = Signal(ScreenerList, tuple)
+                updated_data.update(orjson.loads(response.content))
+
+            # Rows are only handed to the UI thread; filtered_stocks is assigned in on_update_data
+            rows = {symbol: quote_row(symbol, data) for symbol, data in updated_data.items()}
+            updates = [
+                (screener_list, [rows[symbol] for symbol in screener_list.symbols if symbol in rows])
+                for screener_list in screener_lists
+            ]
+
+            for screener_list, new_filtered_stocks in updates:
+                # The change check runs in on_update_data, where filtered_stocks is owned
+                self.update_data.emit(screener_list, new_filtered_stocks)
+        except requests.exceptions.Timeout:
+            logger.error("Backend timed out in StockUpdater")
+            logger.debug("Symbols: %s", symbols)
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+            logger.error("Error in StockUpdater: %s", e)
+            logger.debug("Symbols: %s", symbols)
+        finally:
+            for screener_list in screener_lists:
+                self.set_loading_signal.emit(screener_list, False)
+
+class TaskSignals(QObject):
+    # QRunnable is not a QObject, so pooled tasks report back through this wrapper
+    add_stock_finished = Signal(ScreenerList, list)
+    update_finished = Signal(ScreenerList, list)
     set_loading_signal = Signal(ScreenerList, bool)
 
-    def __init__(self, parent, screener_list, symbol):
-        super().__init__(parent)
-        self.parent = parent
+class AddStockTask(QRunnable):
+    def __init__(self, parent, screener_list, symbols):
+        super().__init__()
+        self.signals = TaskSignals()
         self.screener_list = screener_list
-        self.symbol = symbol
-        # Set up a session with retries
-        self.session = requests.Session()
-        retries = Retry(total=3, backoff_factor=1, status_forcelist=[500, 502, 503, 504])
-        self.session.mount("http://", HTTPAdapter(max_retries=retries))
+        self.symbols = symbols
+        # Goes through the screener's pooled session and short-lived lookup cache
+        self.fetch_screen = parent.fetch_screen
 
     def run(self):
         try:
-            self.set_loading_signal.emit(self.screener_list, True)
-            response = self.session.post(
-                "http://127.0.0.1:5000/api/screen",
-                json={"symbols": [self.symbol]},
-                timeout=30  # Increased timeout to 30 seconds
-            )
-            response.raise_for_status()
-            stock_data = response.json()
-
-            if stock_data and isinstance(stock_data, list) and len(stock_data) > 0:
-                stock = stock_data[0]
-                stock_tuple = (
-                    stock["symbol"],          # Symbol
-                    stock["price"],           # Price
-                    stock["change_percentage"],  # Change percentage
-                    stock["change"],          # Change
-                    stock["volume"],          # Volume
-                    stock["bid"],             # Bid
-                    stock["ask"]              # Ask
-                )
-                self.add_stock_finished.emit(self.screener_list, stock_tuple)
+            self.signals.set_loading_signal.emit(self.screener_list, True)
+            # Symbols entered at once share requests, chunked to the backend's per-request limit
+            stock_data = self.fetch_screen(self.symbols, use_cache=True)
+
+            if stock_data and isinstance(stock_data, list):
+                stock_tuples = [
+                    (
+                        stock["symbol"],          # Symbol
+                        stock["price"],           # Price
+                        stock["change_percentage"],  # Change percentage
+                        stock["change"],          # Change
+                        stock["volume"],          # Volume
+                        stock["bid"],             # Bid
+                        stock["ask"],             # Ask
+                        stock["bid"] - stock["ask"]  # Up/Down sort key
+                    )
+                    for stock in stock_data
+                ]
+                self.signals.add_stock_finished.emit(self.screener_list, stock_tuples)
+                missing = set(self.symbols).difference(stock[0] for stock in stock_tuples)
+                if missing:
+                    logger.warning("No data returned for symbols: %s", sorted(missing))
             else:
-                logger.warning(f"No data returned for symbol: {self.symbol}")
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Error adding stock {self.symbol} to list {self.screener_list.name}: {str(e)}")
+                logger.warning("No data returned for symbols: %s", self.symbols)
+        except requests.exceptions.Timeout:
+            logger.error("Backend timed out adding stocks %s to list %s", self.symbols, self.screener_list.name)
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+            logger.error("Error adding stocks %s to list %s: %s", self.symbols, self.screener_list.name, e)
         except KeyError as e:
-            logger.error(f"Unexpected response format from /api/screen for symbol {self.symbol}: {stock_data}")
-            logger.error(f"KeyError: {str(e)}")
+            logger.error("Unexpected response format from /api/screen for symbols %s: %s", self.symbols, stock_data)
+            logger.error("KeyError: %s", e)
         finally:
-            self.set_loading_signal.emit(self.screener_list, False)
+            self.signals.set_loading_signal.emit(self.screener_list, False)
             
-class StartUpdateWorker(QThread):
-    update_finished = Signal(ScreenerList, list)
-    set_loading_signal = Signal(ScreenerList, bool)
-
+class StartUpdateTask(QRunnable):
     def __init__(self, parent, screener_list, symbols):
-        super().__init__(parent)
-        self.parent = parent
+        super().__init__()
+        self.signals = TaskSignals()
         self.screener_list = screener_list
         self.symbols = symbols
-        # Set up a session with retries
-        self.session = requests.Session()
-        retries = Retry(total=3, backoff_factor=1, status_forcelist=[500, 502, 503, 504])
-        self.session.mount("http://", HTTPAdapter(max_retries=retries))
+        # Goes through the screener's pooled session; always fresh, since the rows
+        # replace the list's data wholesale
+        self.fetch_screen = parent.fetch_screen
 
     def run(self):
         try:
-            self.set_loading_signal.emit(self.screener_list, True)
-            response = self.session.post(
-                "http://127.0.0.1:5000/api/screen",
-                json={"symbols": self.symbols},
-                timeout=30  # Increased timeout to 30 seconds
-            )
-            response.raise_for_status()
-            stock_data = response.json()
+            self.signals.set_loading_signal.emit(self.screener_list, True)
+            stock_data = self.fetch_screen(self.symbols)
             filtered_stocks = [
                 (
                     stock["symbol"],          # Symbol
@@ -224,30 +450,76 @@ class StartUpdateWorker(QThread):
                     stock["change"],          # Change
                     stock["volume"],          # Volume
                     stock["bid"],             # Bid
-                    stock["ask"]              # Ask
+                    stock["ask"],             # Ask
+                    stock["bid"] - stock["ask"]  # Up/Down sort key
                 )
                 for stock in stock_data
             ]
-            self.update_finished.emit(self.screener_list, filtered_stocks)
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Error in StartUpdateWorker for list {self.screener_list.name}: {str(e)}")
-            logger.debug(f"Symbols: {self.symbols}")
+            self.signals.update_finished.emit(self.screener_list, filtered_stocks)
+        except requests.exceptions.Timeout:
+            logger.error("Backend timed out refreshing list %s", self.screener_list.name)
+            logger.debug("Symbols: %s", self.symbols)
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+            logger.error("Error in StartUpdateTask for list %s: %s", self.screener_list.name, e)
+            logger.debug("Symbols: %s", self.symbols)
         except KeyError as e:
-            logger.error(f"Unexpected response format from /api/screen: {stock_data}")
-            logger.error(f"KeyError: {str(e)}")
+            logger.error("Unexpected response format from /api/screen: %s", stock_data)
+            logger.error("KeyError: %s", e)
         finally:
-            self.set_loading_signal.emit(self.screener_list, False)
+            self.signals.set_loading_signal.emit(self.screener_list, False)
 
 class StockScreener(QWidget):
     def __init__(self):
         super().__init__()
         self.screener_lists = []
-        self.lock = threading.Lock()
-        self.update_timers = {}
-        self.pending_updates = {}
+        # One pooled keep-alive session with retries, shared by every worker thread
+        self.http = requests.Session()
+        retries = Retry(total=3, backoff_factor=1, status_forcelist=[500, 502, 503, 504])
+        self.http.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retries))
+        # Request bodies are pre-encoded with orjson and sent as data=
+        self.http.headers["Content-Type"] = "application/json"
+        # Bounded pool for add-stock/start-update tasks, separate from Qt's global pool
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(MAX_WORKER_THREADS)
+        self._screen_cache = {}  # tuple(symbols) -> (monotonic timestamp, /api/screen response)
+        self._last_saved_payload = None
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(SAVE_DEBOUNCE_MS)
+        self._save_timer.timeout.connect(self._save_screener_lists)
+        # Rapid edits (e.g. removing several stocks) refresh each touched list once
+        self._pending_start_updates = set()
+        self._start_update_timer = QTimer(self)
+        self._start_update_timer.setSingleShot(True)
+        self._start_update_timer.setInterval(START_UPDATE_DEBOUNCE_MS)
+        self._start_update_timer.timeout.connect(self._flush_start_updates)
         self.setup_ui()
         self._load_screener_lists()
 
+        # A single updater polls every list in one batched request per cycle;
+        # the timer drives the cycles instead of a thread sleeping between them
+        self.updater = StockUpdater(self)
+        self.updater.update_data.connect(self.on_update_data)
+        self.updater.set_loading_signal.connect(self.set_loading)
+        self.poll_timer = QTimer(self)
+        self.poll_timer.setInterval(POLL_INTERVAL_MS)
+        self.poll_timer.timeout.connect(self.poll_quotes)
+        self.poll_timer.start()
+        self.poll_quotes()
+
+        # Quotes are pushed over a WebSocket when the backend accepts one; polling
+        # only runs while the socket is down
+        self._subscribed_symbols = None
+        self.quote_socket = QWebSocket()
+        self.quote_socket.connected.connect(self.on_quote_socket_connected)
+        self.quote_socket.disconnected.connect(self.on_quote_socket_disconnected)
+        self.quote_socket.textMessageReceived.connect(self.on_quote_message)
+        self._reconnect_timer = QTimer(self)
+        self._reconnect_timer.setSingleShot(True)
+        self._reconnect_timer.setInterval(SOCKET_RECONNECT_MS)
+        self._reconnect_timer.timeout.connect(self.open_quote_socket)
+        self.open_quote_socket()
+
     def setup_ui(self):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(15, 15, 15, 15)
@@ -275,21 +547,6 @@ class StockScreener(QWidget):
         add_list_button.clicked.connect(self.create_new_list)
         layout.addWidget(add_list_button)
 
-    def format_market_cap(self, market_cap_billions):
-        """
-        Format market cap (in billions) to abbreviated form (T, B, M).
-        Args:
-            market_cap_billions: Market capitalization in billions.
-        Returns:
-            Formatted string (e.g., '3.11T', '500B', '500M').
-        """
-        if market_cap_billions >= 1000:
-            return f"{market_cap_billions / 1000:.2f}T"  # Trillions
-        elif market_cap_billions >= 1:
-            return f"{market_cap_billions:.2f}B"  # Billions
-        else:
-            return f"{market_cap_billions * 1000:.0f}M"  # Millions
-
     def create_table_for_list(self, screener_list):
         list_container = QVBoxLayout()
 
@@ -315,38 +572,22 @@ class StockScreener(QWidget):
         header_layout.addStretch()
         list_container.addLayout(header_layout)
 
-        table = CustomTableWidget()
-        table.setColumnCount(6)  # Added one column for Volume
-        table.setHorizontalHeaderLabels([
-            "Symbol", 
-            "Price ($)", 
-            "Change (%)", 
-            "Market Cap",  # Updated header
-            "Volume (Shares)", 
-            "Up/Down"
-        ])
+        table = CustomTableView()
+        table.setModel(StockTableModel(table))
         table.horizontalHeader().setVisible(True)
         table.verticalHeader().setVisible(False)
-        table.horizontalHeaderItem(0).setToolTip("Stock ticker symbol (e.g., AAPL)")
-        table.horizontalHeaderItem(1).setToolTip("Current stock price in USD")
-        table.horizontalHeaderItem(2).setToolTip("Daily price change percentage")
-        table.horizontalHeaderItem(3).setToolTip("Market capitalization (T: trillions, B: billions, M: millions)")
-        table.horizontalHeaderItem(4).setToolTip("Total trading volume (number of shares)")
-        table.horizontalHeaderItem(5).setToolTip("Up (green, right) and Down (red, left) volume meter")
-        for i in range(table.columnCount()):
-            table.horizontalHeaderItem(i).setTextAlignment(Qt.AlignCenter)
         table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         table.setAlternatingRowColors(True)
-        table.setEditTriggers(CustomTableWidget.NoEditTriggers)
+        table.setEditTriggers(CustomTableView.NoEditTriggers)
         table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background-color: #2E3440;
                 alternate-background-color: #3B4252;
             }
-            QTableWidget::item {
+            QTableView::item {
                 text-align: center;
             }
-            QTableWidget::item:hover {
+            QTableView::item:hover {
                 background-color: #4C566A;
             }
             QHeaderView::section {
@@ -359,9 +600,7 @@ class StockScreener(QWidget):
         table.setSortingEnabled(False)
 
         header_height = table.horizontalHeader().height()
-        table.setRowCount(1)
-        row_height = table.rowHeight(0)
-        table.setRowCount(0)
+        row_height = table.verticalHeader().defaultSectionSize()
         min_height = header_height + (5 * row_height)
         table.setMinimumHeight(min_height)
 
@@ -375,10 +614,10 @@ class StockScreener(QWidget):
 
         table_edit = TableEdit(table, self, screener_list)
         table_edit.trigger_start_update.connect(
-            lambda: self.handle_start_update(screener_list)
+            lambda: self.request_start_update(screener_list)
         )
         table_edit.table_updated.connect(
-            lambda: self.schedule_table_update(screener_list)
+            lambda: self.update_table(screener_list)
         )
 
         button_container = QHBoxLayout()
@@ -405,67 +644,146 @@ class StockScreener(QWidget):
 
         self.tables_container.addLayout(list_container)
 
-        update_timer = QTimer(self)
-        update_timer.setSingleShot(True)
-        update_timer.timeout.connect(
-            lambda sl=screener_list: self.deferred_update_table(sl)
-        )
-        self.update_timers[screener_list] = update_timer
-        self.pending_updates[screener_list] = False
-
-        updater = StockUpdater(self, screener_list)
-        updater.update_data.connect(self.on_update_data)
-        updater.set_loading_signal.connect(self.set_loading)
-        updater.start()
-        screener_list.updater = updater
-
     def _load_screener_lists(self):
         try:
-            if os.path.exists("json/screener_lists.json"):
-                with open("json/screener_lists.json", "r") as f:
+            if os.path.exists(SCREENER_LISTS_PATH):
+                with open(SCREENER_LISTS_PATH, "r") as f:
                     data = json.load(f)
                     self.screener_lists = []
                     for list_data in data:
-                        # Load both symbols and display_order from JSON
+                        # Load both symbols and manual_order from JSON
                         symbols = list_data.get("symbols", [])
-                        display_order = list_data.get("display_order", symbols)  # Fallback to symbols if not present
-                        # Ensure display_order contains only valid symbols
-                        display_order = [symbol for symbol in display_order if symbol in symbols]
-                        # Add any missing symbols to the end of display_order
+                        # Older files stored the order as "display_order"; fall back to symbols if neither is present
+                        manual_order = list_data.get("manual_order", list_data.get("display_order", symbols))
+                        # Ensure manual_order contains only valid symbols
+                        manual_order = [symbol for symbol in manual_order if symbol in symbols]
+                        # Add any missing symbols to the end of manual_order
                         for symbol in symbols:
-                            if symbol not in display_order:
-                                display_order.append(symbol)
+                            if symbol not in manual_order:
+                                manual_order.append(symbol)
                         screener_list = ScreenerList(
                             name=list_data["name"],
                             symbols=symbols,
-                            display_order=display_order
+                            manual_order=manual_order
                         )
                         self.screener_lists.append(screener_list)
             if not self.screener_lists:
-                self.screener_lists.append(ScreenerList("Default List", ["AAPL", "MSFT", "GOOGL"]))
+                self.screener_lists.append(ScreenerList("Default List", list(DEFAULT_SYMBOLS)))
             for screener_list in self.screener_lists:
                 self.create_table_for_list(screener_list)
                 self.handle_start_update(screener_list)
         except Exception as e:
-            logger.error(f"Error loading screener lists: {e}")
-            self.screener_lists = [ScreenerList("Default List", ["AAPL", "MSFT", "GOOGL"])]
+            logger.error("Error loading screener lists: %s", e)
+            self.screener_lists = [ScreenerList("Default List", list(DEFAULT_SYMBOLS))]
             for screener_list in self.screener_lists:
                 self.create_table_for_list(screener_list)
 
+    def fetch_screen(self, symbols, use_cache=False):
+        """
+        POST /api/screen for the given symbols.
+        With use_cache, a response younger than SCREEN_CACHE_TTL for the same symbol set
+        is reused; only add-stock lookups opt in, since list refreshes must not bring back
+        rows older than the polled or pushed ones.
+        Called from pool threads; single dict reads and writes are atomic.
+        """
+        # The backend sorts symbols anyway, so the set order doesn't matter
+        key = tuple(sorted(symbols))
+        if use_cache:
+            cached = self._screen_cache.get(key)
+            if cached is not None and time.monotonic() - cached[0] < SCREEN_CACHE_TTL:
+                logger.debug("Screen cache hit for %s symbols", len(key))
+                return cached[1]
+            logger.debug("Screen cache miss for %s symbols", len(key))
+        # The backend rejects more than MAX_SYMBOLS_PER_REQUEST symbols per request
+        stock_data = []
+        for start in range(0, len(key), MAX_SYMBOLS_PER_REQUEST):
+            response = self.http.post(
+                "http://127.0.0.1:5000/api/screen",
+                data=orjson.dumps({"symbols": key[start:start + MAX_SYMBOLS_PER_REQUEST]}),
+                timeout=REQUEST_TIMEOUT
+            )
+            response.raise_for_status()
+            stock_data.extend(orjson.loads(response.content))
+        if use_cache:
+            if len(self._screen_cache) >= SCREEN_CACHE_MAXSIZE:
+                self._screen_cache.clear()
+            self._screen_cache[key] = (time.monotonic(), stock_data)
+        return stock_data
+
+    def _request_save(self):
+        # Coalesce bursts of changes into at most one write per save interval
+        self._save_timer.start()
+
+    def open_quote_socket(self):
+        self.quote_socket.open(QUOTE_SOCKET_URL)
+
+    @Slot()
+    def on_quote_socket_connected(self):
+        logger.info("Quote socket connected; pausing polling")
+        self.poll_timer.stop()
+        self._subscribed_symbols = None
+        self._subscribe_quotes()
+
+    @Slot()
+    def on_quote_socket_disconnected(self):
+        logger.info("Quote socket unavailable; falling back to polling")
+        self._subscribed_symbols = None
+        if not self.poll_timer.isActive():
+            self.poll_timer.start()
+        self._reconnect_timer.start()
+
+    def _resync_quotes(self):
+        # Resubscribing makes the server send every quote, not only changed ones
+        self._subscribed_symbols = None
+        self._subscribe_quotes()
+
+    def _subscribe_quotes(self):
+        # Only (re)subscribe when the union of symbols actually changed
+        if not self.quote_socket.isValid():
+            return
+        symbols = sorted(set().union(*(sl.symbols for sl in self.screener_lists)))
+        if symbols != self._subscribed_symbols:
+            self._subscribed_symbols = symbols
+            self.quote_socket.sendTextMessage(orjson.dumps({"subscribe": symbols}).decode())
+
+    @Slot(str)
+    def on_quote_message(self, message):
+        try:
+            rows = {symbol: quote_row(symbol, data) for symbol, data in orjson.loads(message).items()}
+        except (orjson.JSONDecodeError, AttributeError, KeyError) as e:
+            logger.error("Unexpected quote socket message: %s", e)
+            return
+        # Only changed quotes are pushed; merge them into each list that holds them
+        for screener_list in self.screener_lists:
+            if not any(symbol in rows for symbol in screener_list.symbols):
+                continue
+            stocks = {stock[0]: stock for stock in screener_list.filtered_stocks}
+            stocks.update((symbol, rows[symbol]) for symbol in screener_list.symbols if symbol in rows)
+            screener_list.filtered_stocks = [stocks[symbol] for symbol in screener_list.symbols if symbol in stocks]
+            self.update_table(screener_list)
+
     def _save_screener_lists(self):
+        self._save_timer.stop()
         try:
             data = [
                 {
                     "name": screener_list.name,
                     "symbols": screener_list.symbols,
-                    "display_order": screener_list.display_order  # Save the display order
+                    "manual_order": screener_list.manual_order  # Save the user-arranged order
                 }
                 for screener_list in self.screener_lists
             ]
-            with open("json/screener_lists.json", "w") as f:
-                json.dump(data, f, indent=4)
+            payload = json.dumps(data, indent=4)
+            if payload == self._last_saved_payload:
+                return
+            # Write to a temporary file and swap it in so a crash never leaves a truncated file
+            tmp_path = SCREENER_LISTS_PATH + ".tmp"
+            with open(tmp_path, "w") as f:
+                f.write(payload)
+            os.replace(tmp_path, SCREENER_LISTS_PATH)
+            self._last_saved_payload = payload
         except Exception as e:
-            logger.error(f"Error saving screener lists: {e}")
+            logger.error("Error saving screener lists: %s", e)
 
     def create_new_list(self):
         name, ok = QInputDialog.getText(self, "New Screener List", "Enter list name:")
@@ -476,7 +794,8 @@ class StockScreener(QWidget):
             screener_list = ScreenerList(name)
             self.screener_lists.append(screener_list)
             self.create_table_for_list(screener_list)
-            self._save_screener_lists()
+            self._request_save()
+            self._subscribe_quotes()
             self.handle_start_update(screener_list)
 
     def rename_list(self, screener_list):
@@ -492,7 +811,7 @@ class StockScreener(QWidget):
             button_container = screener_list.container_layout.itemAt(2).layout()
             add_stock_button = button_container.itemAt(1).widget()
             add_stock_button.setObjectName(f"AddStockButton_{name}")
-            self._save_screener_lists()
+            self._request_save()
 
     def delete_list(self, screener_list):
         if len(self.screener_lists) <= 1:
@@ -507,9 +826,6 @@ class StockScreener(QWidget):
             QMessageBox.No
         )
         if reply == QMessageBox.Yes:
-            screener_list.updater.running = False
-            screener_list.updater.wait()
-
             container_layout = screener_list.container_layout
             while container_layout.count():
                 item = container_layout.takeAt(0)
@@ -525,112 +841,130 @@ class StockScreener(QWidget):
             container_layout.deleteLater()
 
             self.screener_lists.remove(screener_list)
-            if screener_list in self.update_timers:
-                self.update_timers[screener_list].stop()
-                del self.update_timers[screener_list]
-            if screener_list in self.pending_updates:
-                del self.pending_updates[screener_list]
 
-            self._save_screener_lists()
+            self._request_save()
+            self._subscribe_quotes()
 
     def add_stock(self, screener_list):
-        symbol, ok = QInputDialog.getText(self, "Add Stock", "Enter stock symbol (e.g., AAPL):")
-        if ok and symbol:
-            symbol = symbol.upper().strip()
-            if symbol in screener_list.symbols:
-                QMessageBox.warning(self, "Error", f"Stock {symbol} is already in the list.")
+        text, ok = QInputDialog.getText(
+            self, "Add Stock", "Enter stock symbols, separated by commas (e.g., AAPL, MSFT):"
+        )
+        if ok and text:
+            # Deduplicate while keeping the order the symbols were typed in
+            entered = list(dict.fromkeys(text.replace(",", " ").upper().split()))
+            invalid = [symbol for symbol in entered if not SYMBOL_PATTERN.match(symbol)]
+            if invalid:
+                QMessageBox.warning(self, "Error", f"Invalid stock symbol: {', '.join(invalid)}")
                 return
-            adder = StockAdder(self, screener_list, symbol)
-            adder.add_stock_finished.connect(self.on_add_stock_finished)
-            adder.set_loading_signal.connect(self.set_loading)
-            adder.start()
-
-    @Slot(ScreenerList, tuple)
-    def on_add_stock_finished(self, screener_list, stock_tuple):
-        with self.lock:
-            if stock_tuple[0] not in screener_list.symbols:
+            existing = set(screener_list.symbols)
+            symbols = [symbol for symbol in entered if symbol not in existing]
+            if not symbols:
+                QMessageBox.warning(self, "Error", f"Already in the list: {', '.join(entered)}")
+                return
+            task = AddStockTask(self, screener_list, symbols)
+            task.signals.add_stock_finished.connect(self.on_add_stock_finished)
+            task.signals.set_loading_signal.connect(self.set_loading)
+            self.pool.start(task)
+
+    @Slot(ScreenerList, list)
+    def on_add_stock_finished(self, screener_list, stock_tuples):
+        existing = set(screener_list.symbols)
+        for stock_tuple in stock_tuples:
+            if stock_tuple[0] not in existing:
+                existing.add(stock_tuple[0])
                 screener_list.symbols.append(stock_tuple[0])
-                # Add the new symbol to the display_order (at the end)
-                screener_list.display_order.append(stock_tuple[0])
+                # Add the new symbol to the manual_order (at the end)
+                screener_list.manual_order.append(stock_tuple[0])
                 screener_list.filtered_stocks.append(stock_tuple)
-                self._save_screener_lists()
-        self.schedule_table_update(screener_list)
+                self._request_save()
+        self._subscribe_quotes()
+        self.update_table(screener_list)
 
     @Slot(ScreenerList, bool)
     def set_loading(self, screener_list, loading):
+        # The batched updater may still report on a list that was just deleted
+        if screener_list not in self.screener_lists:
+            return
         screener_list.loading_bar.setVisible(loading)
 
     @Slot(ScreenerList, list)
     def on_update_data(self, screener_list, filtered_stocks):
-        with self.lock:
-            screener_list.filtered_stocks = filtered_stocks
-        self.schedule_table_update(screener_list)
+        # Quiet lists skip the table pass entirely
+        if not rows_changed(screener_list.filtered_stocks, filtered_stocks):
+            return
+        screener_list.filtered_stocks = filtered_stocks
+        self.update_table(screener_list)
+
+    def poll_quotes(self):
+        # Skip this tick if the previous cycle is still in flight
+        if not self.updater.isRunning():
+            self.updater.start()
+
+    def request_start_update(self, screener_list):
+        self._pending_start_updates.add(screener_list)
+        self._start_update_timer.start()
+
+    def _flush_start_updates(self):
+        pending, self._pending_start_updates = self._pending_start_updates, set()
+        for screener_list in pending:
+            if screener_list in self.screener_lists:
+                self.handle_start_update(screener_list)
 
     def handle_start_update(self, screener_list):
         if not screener_list.symbols:
             return
-        worker = StartUpdateWorker(self, screener_list, screener_list.symbols)
-        worker.update_finished.connect(self.on_start_update_finished)
-        worker.set_loading_signal.connect(self.set_loading)
-        worker.start()
+        task = StartUpdateTask(self, screener_list, screener_list.symbols)
+        task.signals.update_finished.connect(self.on_start_update_finished)
+        task.signals.set_loading_signal.connect(self.set_loading)
+        self.pool.start(task)
 
     @Slot(ScreenerList, list)
     def on_start_update_finished(self, screener_list, filtered_stocks):
-        with self.lock:
-            screener_list.filtered_stocks = filtered_stocks
-            # Update display_order based on the initial filtered_stocks order if not set
-            if not screener_list.display_order:
-                screener_list.display_order = [stock[0] for stock in filtered_stocks]
-        self.schedule_table_update(screener_list)
-
-    def schedule_table_update(self, screener_list):
-        if screener_list not in self.pending_updates:
-            logger.warning(f"ScreenerList {screener_list.name} not found in pending_updates. Skipping update.")
-            return
-        if not self.pending_updates[screener_list]:
-            self.pending_updates[screener_list] = True
-            self.update_timers[screener_list].start(50)
-
-    @Slot()
-    def deferred_update_table(self, screener_list):
-        if screener_list not in self.pending_updates:
-            logger.warning(f"ScreenerList {screener_list.name} not found in pending_updates during deferred update. Skipping.")
-            return
-        self.pending_updates[screener_list] = False
+        screener_list.filtered_stocks = filtered_stocks
+        # Update manual_order based on the initial filtered_stocks order if not set
+        if not screener_list.manual_order:
+            screener_list.manual_order = [stock[0] for stock in filtered_stocks]
         self.update_table(screener_list)
+        # /api/screen rows lack market cap and up/down volumes; pull a full quote snapshot
+        self._resync_quotes()
 
     def update_table(self, screener_list):
+        # Workers may still report on a list that was just deleted
+        if screener_list not in self.screener_lists:
+            return
+        # Nothing to do when neither the data, the manual order nor the sort changed
+        render_key = (
+            hash(tuple(screener_list.filtered_stocks)),
+            hash(tuple(screener_list.manual_order)),
+            screener_list.sort_column,
+            screener_list.sort_order
+        )
+        if render_key == screener_list._last_render_key:
+            return
+        screener_list._last_render_key = render_key
         table = screener_list.table
-        with self.lock:
-            # Create a mapping of symbol to stock data
-            stock_dict = {stock[0]: stock for stock in screener_list.filtered_stocks}
-            # Order stocks according to display_order, falling back to available data
-            stocks_to_display = []
-            # First, add stocks in the display_order that still exist in filtered_stocks
-            for symbol in screener_list.display_order:
-                if symbol in stock_dict:
-                    stocks_to_display.append(stock_dict[symbol])
-                    del stock_dict[symbol]  # Remove to avoid duplicates
-            # Then, append any remaining stocks that weren't in display_order
-            stocks_to_display.extend(stock_dict.values())
-
-            # Apply sorting if a sort column is active
-            if screener_list.sort_column >= 0:
-                if screener_list.sort_column == 5:  # Up/Down column
-                    stocks_to_display.sort(
-                        key=lambda x: x[5] - x[6],
-                        reverse=(screener_list.sort_order == Qt.DescendingOrder)
-                    )
-                else:
-                    stocks_to_display.sort(
-                        key=lambda x: (
-                            x[screener_list.sort_column] if screener_list.sort_column != 2 else x[2]
-                        ),
-                        reverse=(screener_list.sort_order == Qt.DescendingOrder)
-                    )
-                # Update display_order to reflect the new sorted order
-                screener_list.display_order = [stock[0] for stock in stocks_to_display]
-                self._save_screener_lists()
+        # Place each stock at its manual_order row in a single pass
+        order_index = screener_list.order_index
+        slots = [None] * len(order_index)
+        unordered = []
+        for stock in screener_list.filtered_stocks:
+            row = order_index.get(stock[0])
+            if row is None:
+                unordered.append(stock)
+            else:
+                slots[row] = stock
+        # Drop rows with no data yet, then append stocks that weren't in manual_order
+        stocks_to_display = [stock for stock in slots if stock is not None]
+        stocks_to_display.extend(unordered)
+
+        # Apply sorting if a sort column is active (display only; manual_order is left as arranged)
+        if screener_list.sort_column >= 0:
+            # The Up/Down column sorts on the precomputed net volume at index 7
+            sort_index = 7 if screener_list.sort_column == 5 else screener_list.sort_column
+            stocks_to_display.sort(
+                key=operator.itemgetter(sort_index),
+                reverse=(screener_list.sort_order == Qt.DescendingOrder)
+            )
 
         max_combined_volume = 1
         for stock in stocks_to_display:
@@ -639,64 +973,37 @@ class StockScreener(QWidget):
             combined = up_volume + down_volume
             max_combined_volume = max(max_combined_volume, combined)
 
+        # The model formats cells on demand and only signals rows that changed
+        table.model().set_stocks(stocks_to_display)
+
         delegate = table.itemDelegateForColumn(5)  # Updated column index
-        if delegate:
+        if delegate and delegate.max_combined_volume != max(1, max_combined_volume):
+            # Every bar is scaled by the maximum, so repaint them all when it moves
             delegate.set_max_combined_volume(max_combined_volume)
-
-        current_row_count = table.rowCount()
-        new_row_count = len(stocks_to_display)
-
-        if current_row_count != new_row_count:
-            table.setRowCount(new_row_count)
-
-        for row, stock in enumerate(stocks_to_display):
-            for col in range(5):  # Updated to 5 to include Volume column
-                item = table.item(row, col)
-                value = stock[col]
-                if col == 3:  # Market Cap column
-                    new_text = self.format_market_cap(value)  # Format market cap
-                elif col == 4:  # Volume column
-                    new_text = f"{int(value):,}"  # Format volume with commas
-                else:
-                    new_text = f"{value:.2f}%" if col == 2 else str(value)
-                if not item or item.text() != new_text:
-                    item = QTableWidgetItem(new_text)
-                    if col == 2:
-                        if value > 0:
-                            item.setForeground(Qt.green)
-                        elif value < 0:
-                            item.setForeground(Qt.red)
-                    item.setTextAlignment(Qt.AlignCenter)
-                    table.setItem(row, col, item)
-
-            # Up/Down column (now column 5)
-            up_volume = stock[5]
-            down_volume = stock[6]
-            item = table.item(row, 5)  # Updated column index
-            if not item:
-                item = QTableWidgetItem()
-                table.setItem(row, 5, item)
-            item.setData(Qt.UserRole, up_volume)
-            item.setData(Qt.UserRole + 1, down_volume)
-            item.setText("")
+            table.viewport().update()
 
     def sort_table(self, screener_list, logical_index):
-        with self.lock:
-            if screener_list.sort_column == logical_index:
-                screener_list.sort_order = (
-                    Qt.DescendingOrder
-                    if screener_list.sort_order == Qt.AscendingOrder
-                    else Qt.AscendingOrder
-                )
-            else:
-                screener_list.sort_column = logical_index
-                screener_list.sort_order = Qt.AscendingOrder
-        self.schedule_table_update(screener_list)
+        if screener_list.sort_column == logical_index:
+            screener_list.sort_order = (
+                Qt.DescendingOrder
+                if screener_list.sort_order == Qt.AscendingOrder
+                else Qt.AscendingOrder
+            )
+        else:
+            screener_list.sort_column = logical_index
+            screener_list.sort_order = Qt.AscendingOrder
+        # Sorting is ephemeral, so there is nothing to persist
+        self.update_table(screener_list)
 
     def closeEvent(self, event):
-        for screener_list in self.screener_lists:
-            if screener_list.updater:
-                screener_list.updater.running = False
-                screener_list.updater.wait()
-        self._save_screener_lists()  # Ensure the latest order is saved on close
+        self._reconnect_timer.stop()
+        self.quote_socket.disconnected.disconnect(self.on_quote_socket_disconnected)
+        self.quote_socket.close()
+        self.poll_timer.stop()
+        self.updater.wait()
+        # Drop queued tasks and let the running ones finish before the session closes
+        self.pool.clear()
+        self.pool.waitForDone()
+        self._save_screener_lists()  # Flush any pending save immediately on close
+        self.http.close()
         event.accept()
\ No newline at end of file
@@ -1,27 +1,36 @@
-from PySide6.QtWidgets import QMenu, QTableWidget
+from PySide6.QtWidgets import QMenu, QTableView
 from PySide6.QtGui import QDrag, QPainter, QPen, QColor, QAction
-from PySide6.QtCore import Qt, QMimeData, QByteArray, Signal, QObject
+from PySide6.QtCore import Qt, QMimeData, QByteArray, QRect, Signal, QObject
 import logging
 
 logger = logging.getLogger(__name__)
 
-class CustomTableWidget(QTableWidget):
+class CustomTableView(QTableView):
     row_order_changed = Signal(list)  # Signal to emit when rows are reordered
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.drop_row = -1
         self.highlight_row = -1
+        # Drop indicator colors, built once instead of on every drag repaint
+        self._highlight_color = QColor(76, 86, 106, 160)  # #4C566A, translucent
+        self._drop_pen = QPen(QColor("#FF5555"), 2, Qt.SolidLine)
 
         # Enable drag-and-drop
         self.setDragEnabled(True)
         self.setAcceptDrops(True)
-        self.setDragDropMode(QTableWidget.InternalMove)
-        self.setSelectionMode(QTableWidget.SingleSelection)
-        self.setSelectionBehavior(QTableWidget.SelectRows)
+        self.setDragDropMode(QTableView.InternalMove)
+        self.setSelectionMode(QTableView.SingleSelection)
+        self.setSelectionBehavior(QTableView.SelectRows)
         self.setDropIndicatorShown(False)  # We'll use a custom indicator
 
+    def rowCount(self):
+        return self.model().rowCount() if self.model() else 0
+
     def set_drop_row(self, row):
+        # dragMoveEvent fires on every mouse move; only repaint when the target row changes
+        if row == self.drop_row:
+            return
         self.drop_row = row
         if row >= self.rowCount():
             self.highlight_row = self.rowCount() - 1
@@ -30,6 +39,8 @@ class CustomTableWidget(QTableWidget):
         self.viewport().update()
 
     def clear_drop_indicator(self):
+        if self.drop_row < 0:
+            return
         self.drop_row = -1
         self.highlight_row = -1
         self.viewport().update()
@@ -41,8 +52,15 @@ class CustomTableWidget(QTableWidget):
             return
 
         painter = QPainter(self.viewport())
-        pen = QPen(QColor("#FF5555"), 2, Qt.SolidLine)
-        painter.setPen(pen)
+
+        if self.highlight_row >= 0:
+            highlight_rect = QRect(
+                0, self.rowViewportPosition(self.highlight_row),
+                self.viewport().width(), self.rowHeight(self.highlight_row)
+            )
+            painter.fillRect(highlight_rect, self._highlight_color)
+
+        painter.setPen(self._drop_pen)
 
         y_pos = 0
         if self.drop_row < self.rowCount():
@@ -54,12 +72,6 @@ class CustomTableWidget(QTableWidget):
         painter.drawLine(0, y_pos, self.viewport().width(), y_pos)
         painter.end()
 
-        if self.highlight_row >= 0:
-            for col in range(self.columnCount()):
-                item = self.item(self.highlight_row, col)
-                if item:
-                    item.setBackground(QColor("#4C566A"))
-
     def dragEnterEvent(self, event):
         if event.mimeData().hasFormat("application/x-screener-row"):
             event.acceptProposedAction()
@@ -83,7 +95,7 @@ class CustomTableWidget(QTableWidget):
 
     def dropEvent(self, event):
         if event.mimeData().hasFormat("application/x-screener-row"):
-            source_row = self.currentRow()
+            source_row = self.currentIndex().row()
             target_row = self.rowAt(event.pos().y())
 
             # Adjust target_row for dropping at the bottom
@@ -100,35 +112,16 @@ class CustomTableWidget(QTableWidget):
             if source_row < target_row:
                 target_row -= 1
 
-            logger.debug(f"Dragging row {source_row} to row {target_row}")
-
-            # Store the items from the source row
-            items = []
-            for col in range(self.columnCount()):
-                item = self.item(source_row, col)
-                items.append(item.clone() if item else None)
-
-            # Remove the source row
-            self.removeRow(source_row)
+            logger.debug("Dragging row %s to row %s", source_row, target_row)
 
-            # Insert a new row at the target position
-            self.insertRow(target_row)
-
-            # Populate the new row with the stored items
-            for col, item in enumerate(items):
-                if item:
-                    self.setItem(target_row, col, item)
+            # Emit the new order of symbols; the model is refilled in that order
+            model = self.model()
+            new_order = [model.symbol_at(row) for row in range(model.rowCount())]
+            new_order.insert(target_row, new_order.pop(source_row))
+            self.row_order_changed.emit(new_order)
 
             # Update the selection
-            self.setCurrentCell(target_row, self.currentColumn())
-
-            # Emit the new order of symbols
-            new_order = []
-            for row in range(self.rowCount()):
-                item = self.item(row, 0)  # Symbol is in column 0
-                if item:
-                    new_order.append(item.text())
-            self.row_order_changed.emit(new_order)
+            self.setCurrentIndex(model.index(target_row, self.currentIndex().column()))
 
             self.clear_drop_indicator()
             event.acceptProposedAction()
@@ -136,7 +129,7 @@ class CustomTableWidget(QTableWidget):
             event.ignore()
 
     def startDrag(self, supportedActions):
-        source_row = self.currentRow()
+        source_row = self.currentIndex().row()
         if source_row < 0:
             return
 
@@ -182,25 +175,24 @@ class TableEdit(QObject):
             return
 
         row = selected_rows[0].row()
-        symbol = self.table.item(row, 0).text()
+        symbol = self.table.model().symbol_at(row)
 
-        with self.parent.lock:
-            if symbol in self.screener_list.symbols:
-                self.screener_list.symbols.remove(symbol)
-                # Also remove from display_order
-                if symbol in self.screener_list.display_order:
-                    self.screener_list.display_order.remove(symbol)
-                self.parent._save_screener_lists()
-                self.screener_list.filtered_stocks = [stock for stock in self.screener_list.filtered_stocks if stock[0] != symbol]
+        if symbol in self.screener_list.symbols:
+            self.screener_list.symbols.remove(symbol)
+            # Also remove from manual_order
+            if symbol in self.screener_list.manual_order:
+                self.screener_list.manual_order.remove(symbol)
+            self.parent._request_save()
+            self.parent._subscribe_quotes()
+            self.screener_list.filtered_stocks = [stock for stock in self.screener_list.filtered_stocks if stock[0] != symbol]
 
         self.table_updated.emit()
         self.trigger_start_update.emit()
 
     def on_row_order_changed(self, new_order):
-        # Update the display_order in screener_list
-        with self.parent.lock:
-            self.screener_list.display_order = new_order
-            self.screener_list.sort_column = -1  # Reset sorting
-            self.screener_list.sort_order = Qt.AscendingOrder
-            self.parent._save_screener_lists()
+        # Update the manual_order in screener_list
+        self.screener_list.manual_order = new_order
+        self.screener_list.sort_column = -1  # Reset sorting
+        self.screener_list.sort_order = Qt.AscendingOrder
+        self.parent._request_save()
         self.table_updated.emit()
\ No newline at end of file
@@ -8,7 +8,11 @@ load_dotenv()
 class Config:
     FLASK_HOST = "0.0.0.0"
     FLASK_PORT = 5000
-    FLASK_DEBUG = True
+    FLASK_DEBUG = os.getenv("FLASK_DEBUG", "false").lower() == "true"  # Enables auto-reload; keep off in production
+    SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "1"))  # Rate limits are per worker process
+    BATCH_WINDOW_MS = float(os.getenv("BATCH_WINDOW_MS", "10"))  # Quote micro-batching window; widen under heavy fan-in
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()  # Set to DEBUG to log request bodies and timings
+    REDIS_URL = os.getenv("REDIS_URL")  # e.g. redis://localhost:6379/0; shares the quote cache across workers
     FLASK_SERVER_ADDRESS = "http://localhost:5000"
     
     TRADIER_API_TOKEN = os.getenv("TRADIER_API")
@@ -1,3 +1,4 @@
+import re
 import time
 import logging
 import aiohttp
@@ -5,8 +6,8 @@ import tenacity
 import yfinance as yf
 import asyncio
 from datetime import datetime, timedelta
+from typing import TypedDict
 from zoneinfo import ZoneInfo
-from collections import defaultdict
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 from flask_app.config import Config
 from flask_app.data.market_calendar import MarketCalendar
@@ -14,6 +15,18 @@ from flask_app.data.sentiment import StockSentiment
 
 logger = logging.getLogger(__name__)
 
+SYMBOL_PATTERN = re.compile(r"^[A-Z]{1,5}(\.[A-Z])?$")  # Ticker with optional share class, e.g. BRK.B
+
+class Quote(TypedDict):
+    """Quote row produced by MarketData.screen_stocks."""
+    price: float
+    change: float
+    volume: int
+    change_percentage: float
+    bid: float
+    ask: float
+    market_cap: float
+
 class MarketData:
     def __init__(self):
         self.tradier_base_url = Config.TRADIER_BASE_URL
@@ -32,16 +45,29 @@ class MarketData:
         self.last_request_time = 0
         self.last_alpaca_request_time = 0
         self.lock = asyncio.Lock()
-        self.cache_ttl = 10
-        self.stock_cache = {}
-        self.buy_sell_cache = {}
+        self.session = None  # Shared aiohttp session, created lazily on the running event loop
         self.stock_sentiment = StockSentiment(
             alpaca_base_url=self.alpaca_base_url,
             alpaca_headers=self.alpaca_headers,
-            rate_limit_per_second=self.alpaca_rate_limit_per_second
+            rate_limit_per_second=self.alpaca_rate_limit_per_second,
+            get_session=self.get_session
         )
         self.market_calendar = MarketCalendar()
 
+    def get_session(self):
+        """Return the shared HTTP session, creating it on first use so connections are pooled across requests."""
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=100, keepalive_timeout=30),
+                timeout=aiohttp.ClientTimeout(total=5, connect=1)
+            )
+        return self.session
+
+    async def close(self):
+        """Close the shared HTTP session."""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+
     async def _rate_limit(self, use_alpaca=True):
         async with self.lock:
             current_time = time.time()
@@ -56,7 +82,7 @@ class MarketData:
 
             sleep_time = (1 / rate_limit) - time_since_last
             if sleep_time > 0:
-                logger.debug(f"Rate limiting {'Alpaca' if use_alpaca else 'Tradier'}: sleeping for {sleep_time:.2f} seconds")
+                logger.debug("Rate limiting %s: sleeping for %.2f seconds", 'Alpaca' if use_alpaca else 'Tradier', sleep_time)
                 await asyncio.sleep(sleep_time)
             setattr(self, last_request_time_ref, current_time)
 
@@ -64,31 +90,26 @@ class MarketData:
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=1, max=10),
         retry=retry_if_exception_type(aiohttp.ClientResponseError),
-        before_sleep=lambda retry_state: logger.debug(f"Retrying API request (attempt {retry_state.attempt_number})...")
+        before_sleep=lambda retry_state: logger.debug("Retrying API request (attempt %s)...", retry_state.attempt_number)
     )
     async def _make_api_request(self, url, params, use_alpaca=True):
         await self._rate_limit(use_alpaca)
         headers = self.alpaca_headers if use_alpaca else self.tradier_headers
-        async with aiohttp.ClientSession(headers=headers) as session:
-            async with session.get(url, params=params) as response:
+        async with self.get_session().get(url, params=params, headers=headers) as response:
+            try:
+                response.raise_for_status()
+                return await response.json()
+            except aiohttp.ClientResponseError as e:
+                error_response = "No response body"
                 try:
-                    response.raise_for_status()
-                    return await response.json()
-                except aiohttp.ClientResponseError as e:
-                    error_response = "No response body"
-                    try:
-                        error_response = await response.text()
-                    except Exception as log_err:
-                        logger.error(f"Failed to fetch error response body: {str(log_err)}")
-                    logger.error(f"ClientResponseError in API request to {url}: Status={e.status}, Message={e.message}, Response={error_response}")
-                    raise
+                    error_response = await response.text()
+                except Exception as log_err:
+                    logger.error("Failed to fetch error response body: %s", log_err)
+                logger.error("ClientResponseError in API request to %s: Status=%s, Message=%s, Response=%s", url, e.status, e.message, error_response)
+                raise
 
     def _validate_symbol(self, symbol):
-        if not isinstance(symbol, str):
-            return False
-        import re
-        pattern = r"^[A-Z]{1,5}(\.[A-Z])?$"
-        return bool(re.match(pattern, symbol))
+        return isinstance(symbol, str) and SYMBOL_PATTERN.match(symbol) is not None
 
     async def get_spy_data(self):
         try:
@@ -98,7 +119,7 @@ class MarketData:
                 params={"symbols": "SPY"},
                 use_alpaca=False
             )
-            logger.debug(f"Tradier API Response: {data}")
+            logger.debug("Tradier API Response: %s", data)
             quote = data["quotes"]["quote"]
             return {
                 "candles": [{
@@ -108,7 +129,7 @@ class MarketData:
                 }]
             }
         except Exception as e:
-            logger.error(f"Error fetching SPY data: {str(e)}")
+            logger.error("Error fetching SPY data: %s", e)
             return None
 
     async def get_price_history(self, symbol, period_type="day", period="1", frequency_type="minute", frequency=1):
@@ -133,7 +154,7 @@ class MarketData:
                 start_str_alpaca = start_time.isoformat()
                 end_str_alpaca = end_time.isoformat()
 
-                logger.debug(f"Fetching price history for {symbol} with interval {interval} using Alpaca API")
+                logger.debug("Fetching price history for %s with interval %s using Alpaca API", symbol, interval)
                 alpaca_interval = f"{frequency}Min" if frequency in [1, 5, 15] else "5Min"
                 params = {
                     "symbols": symbol,
@@ -147,7 +168,7 @@ class MarketData:
                     params=params,
                     use_alpaca=True
                 )
-                logger.debug(f"Alpaca API Response: {data}")
+                logger.debug("Alpaca API Response: %s", data)
                 # Handle both possible structures: bars as a list or bars as a dict with symbol keys
                 bars_data = data.get("bars", [])
                 if isinstance(bars_data, dict):
@@ -155,7 +176,7 @@ class MarketData:
                 else:
                     bars = bars_data
                 if not bars or not isinstance(bars, list) or not all(isinstance(bar, dict) for bar in bars):
-                    logger.warning(f"No valid timesales data available for {symbol} from Alpaca. Response: {data}")
+                    logger.warning("No valid timesales data available for %s from Alpaca. Response: %s", symbol, data)
                     return {"candles": []}
 
                 candles = [
@@ -174,7 +195,7 @@ class MarketData:
                 start_str = start_date.strftime("%Y-%m-%d")
                 end_str = end_date.strftime("%Y-%m-%d")
 
-                logger.debug(f"Fetching price history for {symbol} with interval {interval} using Tradier history")
+                logger.debug("Fetching price history for %s with interval %s using Tradier history", symbol, interval)
                 data = await self._make_api_request(
                     f"{self.tradier_base_url}/markets/history",
                     params={
@@ -185,10 +206,10 @@ class MarketData:
                     },
                     use_alpaca=False
                 )
-                logger.debug(f"Tradier API Response: {data}")
+                logger.debug("Tradier API Response: %s", data)
                 history = data.get("history", {}).get("day", [])
                 if not history:
-                    logger.warning(f"No history data available for {symbol}")
+                    logger.warning("No history data available for %s", symbol)
                     return {"candles": []}
 
                 if isinstance(history, dict):
@@ -205,7 +226,7 @@ class MarketData:
                 return {"candles": candles}
 
         except Exception as e:
-            logger.error(f"Error fetching price history for {symbol}: {str(e)}")
+            logger.error("Error fetching price history for %s: %s", symbol, e)
             # Fallback: Use recent quote data to estimate trend
             try:
                 quote_data = await self._make_api_request(
@@ -234,24 +255,29 @@ class MarketData:
                 ]
                 return {"candles": candles}
             except Exception as fallback_err:
-                logger.error(f"Fallback failed for {symbol}: {str(fallback_err)}")
+                logger.error("Fallback failed for %s: %s", symbol, fallback_err)
                 return {"candles": []}
 
-    async def screen_stocks(self, symbols):
+    async def screen_stocks(self, symbols) -> dict[str, Quote]:
+        """
+        Fetch quotes for a list of symbols.
+        Returns:
+            Dictionary mapping each symbol to its Quote, or {} on failure.
+        """
         if not symbols:
-            return []
+            return {}
 
         valid_symbols = [symbol for symbol in symbols if self._validate_symbol(symbol)]
         if not valid_symbols:
             logger.error("No valid symbols provided for screening.")
-            return []
+            return {}
         if len(valid_symbols) < len(symbols):
             invalid_symbols = set(symbols) - set(valid_symbols)
-            logger.warning(f"Skipping invalid symbols for screening: {invalid_symbols}")
+            logger.warning("Skipping invalid symbols for screening: %s", invalid_symbols)
 
-        results = []
+        results = {}
         valid_symbols_str = ",".join(valid_symbols)
-        logger.debug(f"Fetching quotes for symbols: {valid_symbols_str}")
+        logger.debug("Fetching quotes for symbols: %s", valid_symbols_str)
 
         try:
             quote_data = await self._make_api_request(
@@ -259,11 +285,11 @@ class MarketData:
                 params={"symbols": valid_symbols_str},
                 use_alpaca=False
             )
-            logger.debug(f"Tradier API Response: {quote_data}")
+            logger.debug("Tradier API Response: %s", quote_data)
             quotes = quote_data.get("quotes", {}).get("quote", [])
             if quotes is None:
-                logger.warning(f"No quote data available for {valid_symbols_str} (quotes is null).")
-                return []
+                logger.warning("No quote data available for %s (quotes is null).", valid_symbols_str)
+                return {}
 
             if isinstance(quotes, dict):
                 quotes = [quotes]
@@ -273,7 +299,7 @@ class MarketData:
             market_cap_results = await asyncio.gather(*market_cap_tasks, return_exceptions=True)
             for symbol, market_cap in zip(valid_symbols, market_cap_results):
                 if isinstance(market_cap, Exception):
-                    logger.warning(f"Failed to fetch market cap for {symbol}: {str(market_cap)}")
+                    logger.warning("Failed to fetch market cap for %s: %s", symbol, market_cap)
                     market_caps[symbol] = 0
                 else:
                     market_caps[symbol] = market_cap / 1000
@@ -281,7 +307,7 @@ class MarketData:
             for quote in quotes:
                 symbol = quote.get("symbol", "").split('.')[0].upper()
                 if not symbol:
-                    logger.warning(f"Invalid quote entry (missing symbol): {quote}")
+                    logger.warning("Invalid quote entry (missing symbol): %s", quote)
                     continue
 
                 price = quote.get("last", 0) or quote.get("close", 0) or 0
@@ -293,103 +319,53 @@ class MarketData:
                 ask = quote.get("ask", 0) or 0
                 market_cap = market_caps.get(symbol, 0)
 
-                results.append((symbol, price, change, volume, change_percentage, bid, ask, market_cap))
+                results[symbol] = Quote(
+                    price=price,
+                    change=change,
+                    volume=volume,
+                    change_percentage=change_percentage,
+                    bid=bid,
+                    ask=ask,
+                    market_cap=market_cap
+                )
         except aiohttp.ClientResponseError as http_err:
-            logger.error(f"HTTP Error fetching quotes for {valid_symbols_str} from Tradier: {str(http_err)}")
-            logger.error(f"Status Code: {http_err.status}")
-            logger.error(f"Response Text: {http_err.message}")
-            return []
+            logger.error("HTTP Error fetching quotes for %s from Tradier: %s", valid_symbols_str, http_err)
+            logger.error("Status Code: %s", http_err.status)
+            logger.error("Response Text: %s", http_err.message)
+            return {}
         except tenacity.RetryError as retry_err:
-            logger.error(f"RetryError fetching quotes for {valid_symbols_str} from Tradier after all attempts: {str(retry_err)}")
+            logger.error("RetryError fetching quotes for %s from Tradier after all attempts: %s", valid_symbols_str, retry_err)
             if retry_err.last_attempt and retry_err.last_attempt.failed:
                 last_error = retry_err.last_attempt.exception()
-                logger.error(f"Last error: {str(last_error)}")
+                logger.error("Last error: %s", last_error)
                 if isinstance(last_error, aiohttp.ClientResponseError):
-                    logger.error(f"Status Code: {last_error.status}")
-                    logger.error(f"Response Text: {last_error.message}")
+                    logger.error("Status Code: %s", last_error.status)
+                    logger.error("Response Text: %s", last_error.message)
                 else:
                     logger.error("Last error is not a ClientResponseError.")
             else:
                 logger.error("No last attempt information available.")
-            return []
+            return {}
         except Exception as e:
-            logger.error(f"Error fetching quotes for {valid_symbols_str} from Tradier: {str(e)}", exc_info=True)
-            return []
+            logger.error("Error fetching quotes for %s from Tradier: %s", valid_symbols_str, e, exc_info=True)
+            return {}
 
-        logger.debug(f"Screened stocks: {results}")
+        logger.debug("Screened stocks: %s", results)
         return results
 
-    async def get_buy_sell_volume(self, symbols, bid_ask_data=None, force_refresh=False):
-        if not symbols:
-            return {}
-
+    async def fetch_raw_volumes(self, symbols):
+        """
+        Fetch the inputs for buy/sell volume inference that do not depend on bid/ask data.
+        The price trends, 1-minute bars and news sentiment are fetched concurrently.
+        Args:
+            symbols: List of stock symbols.
+        Returns:
+            Dictionary with "trends" (symbol -> -1/0/1), "trades" (symbol -> list of trades)
+            and "sentiment" (symbol -> score between -1 and +1).
+        """
         valid_symbols = [symbol for symbol in symbols if self._validate_symbol(symbol)]
         if not valid_symbols:
-            logger.error("No valid symbols provided for buy/sell volume.")
-            return {}
-        if len(valid_symbols) < len(symbols):
-            invalid_symbols = set(symbols) - set(valid_symbols)
-            logger.warning(f"Skipping invalid symbols for buy/sell volume: {invalid_symbols}")
-
-        results = {}
-        current_time = time.time()
-        valid_symbols_to_fetch = []
-
-        if not force_refresh:
-            for symbol in valid_symbols:
-                if symbol in self.buy_sell_cache:
-                    cached_data = self.buy_sell_cache[symbol]
-                    if current_time - cached_data["timestamp"] < self.cache_ttl:
-                        results[symbol] = (cached_data["buy_volume"], cached_data["sell_volume"])
-                        logger.debug(f"Using cached buy/sell volume for {symbol}: {results[symbol]}")
-                        continue
-                valid_symbols_to_fetch.append(symbol)
-        else:
-            logger.debug("Force refresh enabled; bypassing cache for all symbols")
-            valid_symbols_to_fetch = valid_symbols
-            for symbol in valid_symbols:
-                self.buy_sell_cache.pop(symbol, None)
-
-        if not valid_symbols_to_fetch:
-            return results
-
-        if bid_ask_data is None:
-            bid_ask_data = {}
-            valid_symbols_str = ",".join(valid_symbols_to_fetch)
-            logger.debug(f"Fetching bid/ask for symbols in a single batch: {valid_symbols_str}")
-            try:
-                quote_data = await self._make_api_request(
-                    f"{self.tradier_base_url}/markets/quotes",
-                    params={"symbols": valid_symbols_str},
-                    use_alpaca=False
-                )
-                quotes = quote_data.get("quotes", {}).get("quote", {})
-                if isinstance(quotes, dict):
-                    quotes = [quotes]
-                for quote in quotes:
-                    symbol = quote["symbol"].split('.')[0].upper()
-                    bid = quote.get("bid", 0)
-                    ask = quote.get("ask", 0)
-                    last_price = quote.get("last", 0) or quote.get("close", 0)
-                    if bid == 0 or ask == 0:
-                        bid = last_price * 0.995
-                        ask = last_price * 1.005
-                    bid_ask_data[symbol] = (bid, ask)
-            except Exception as e:
-                logger.error(f"Error fetching bid/ask data for {valid_symbols_str}: {str(e)}")
-                for symbol in valid_symbols_to_fetch:
-                    stock_data = await self.screen_stocks([symbol])
-                    last_price = stock_data[0][1] if stock_data else 0
-                    bid = last_price * 0.995
-                    ask = last_price * 1.005
-                    bid_ask_data[symbol] = (bid, ask)
-
-        total_volumes = {}
-        stock_data = await self.screen_stocks(symbols=valid_symbols_to_fetch)
-        for stock in stock_data:
-            symbol = stock[0]
-            total_volume = stock[3]
-            total_volumes[symbol] = total_volume
+            return {"trends": {}, "trades": {}, "sentiment": {}}
 
         current_time_dt = datetime.utcnow().replace(tzinfo=ZoneInfo("UTC"))
         current_time_eastern = current_time_dt.astimezone(self.market_calendar.timezone)
@@ -413,158 +389,142 @@ class MarketData:
 
         start_ts = start_time.isoformat()
         end_ts = end_time.isoformat()
-        logger.debug(f"Time range for buy/sell volume: start={start_ts}, end={end_ts}")
+        logger.debug("Time range for buy/sell volume: start=%s, end=%s", start_ts, end_ts)
 
-        price_trends = {}
-        for symbol in valid_symbols_to_fetch:
-            try:
-                history_data = await self.get_price_history(
-                    symbol,
-                    period_type="day",
-                    period="1",
-                    frequency_type="minute",
-                    frequency=5
-                )
-                if history_data and "candles" in history_data:
-                    candles = history_data["candles"][-12:]
-                    if len(candles) >= 2:
-                        prices = [candle["close"] for candle in candles]
-                        sma_short = sum(prices[-3:]) / 3
-                        sma_long = sum(prices[:3]) / 3
-                        trend = 1 if sma_short > sma_long else -1 if sma_short < sma_long else 0
-                        price_trends[symbol] = trend
-                    else:
-                        price_trends[symbol] = 0
-                else:
-                    price_trends[symbol] = 0
-            except Exception as e:
-                logger.error(f"Error fetching price history for trend analysis of {symbol}: {str(e)}")
-                price_trends[symbol] = 0
-
-        trades_by_symbol = defaultdict(list)
-        if valid_symbols_to_fetch:
-            async def fetch_timesales(symbol):
-                logger.debug(f"Fetching timesales for {symbol} from Alpaca API")
-                params = {
-                    "symbols": symbol,
-                    "timeframe": "1Min",
-                    "start": start_ts,
-                    "end": end_ts
-                }
-                logger.debug(f"Alpaca timesales request parameters for {symbol}: {params}")
-                try:
-                    alpaca_url = f"{self.alpaca_base_url.rstrip('/')}/v2/stocks/bars"
-                    data = await self._make_api_request(
-                        alpaca_url,
-                        params=params,
-                        use_alpaca=True
-                    )
-                    logger.debug(f"Alpaca API Response for {symbol}: {data}")
-                    # Handle both possible structures: bars as a list or bars as a dict with symbol keys
-                    bars_data = data.get("bars", [])
-                    if isinstance(bars_data, dict):
-                        bars = bars_data.get(symbol, [])
-                    else:
-                        bars = bars_data
-                    if not bars or not isinstance(bars, list) or not all(isinstance(bar, dict) for bar in bars):
-                        logger.warning(f"No valid trade data available for {symbol} from Alpaca. Response: {data}")
-                        return symbol, []
-                    trades = [
-                        {
-                            "price": bar["c"],
-                            "volume": bar["v"],
-                            "time": bar["t"]
-                        }
-                        for bar in bars
-                    ]
-                    return symbol, trades
-                except Exception as e:
-                    logger.error(f"Error fetching timesales for {symbol} from Alpaca: {str(e)}")
-                    return symbol, []
-
-            timesales_results = await asyncio.gather(
-                *[fetch_timesales(symbol) for symbol in valid_symbols_to_fetch],
+        trend_results, timesales_results, sentiment_scores = await asyncio.gather(
+            asyncio.gather(
+                *[self._get_price_trend(symbol) for symbol in valid_symbols],
                 return_exceptions=True
-            )
+            ),
+            asyncio.gather(
+                *[self._fetch_timesales(symbol, start_ts, end_ts) for symbol in valid_symbols],
+                return_exceptions=True
+            ),
+            self._get_sentiment_scores(valid_symbols)
+        )
 
-            for result in timesales_results:
-                if isinstance(result, tuple):
-                    symbol, trades = result
-                    if trades:
-                        trades_by_symbol[symbol] = trades
-                    else:
-                        logger.warning(f"No trade data available for {symbol}. Falling back to trend-based split.")
-                        total_volume = total_volumes.get(symbol, 0)
-                        trend = price_trends.get(symbol, 0)
-                        if trend > 0:
-                            buy_volume = int(total_volume * 0.6)
-                            sell_volume = total_volume - buy_volume
-                        elif trend < 0:
-                            buy_volume = int(total_volume * 0.4)
-                            sell_volume = total_volume - buy_volume
-                        else:
-                            buy_volume = total_volume // 2
-                            sell_volume = total_volume - buy_volume
-                        results[symbol] = (buy_volume, sell_volume)
-                        self.buy_sell_cache[symbol] = {
-                            "buy_volume": buy_volume,
-                            "sell_volume": sell_volume,
-                            "timestamp": current_time
-                        }
-                else:
-                    logger.error(f"Unexpected result from timesales fetch: {result}")
+        price_trends = {}
+        for symbol, trend in zip(valid_symbols, trend_results):
+            if isinstance(trend, Exception):
+                logger.error("Error fetching price history for trend analysis of %s: %s", symbol, trend)
+                trend = 0
+            price_trends[symbol] = trend
+
+        trades_by_symbol = {}
+        for result in timesales_results:
+            if isinstance(result, tuple):
+                symbol, trades = result
+                if trades:
+                    trades_by_symbol[symbol] = trades
+            else:
+                logger.error("Unexpected result from timesales fetch: %s", result)
+
+        return {"trends": price_trends, "trades": trades_by_symbol, "sentiment": sentiment_scores}
 
+    async def _get_price_trend(self, symbol):
+        history_data = await self.get_price_history(
+            symbol,
+            period_type="day",
+            period="1",
+            frequency_type="minute",
+            frequency=5
+        )
+        if history_data and "candles" in history_data:
+            candles = history_data["candles"][-12:]
+            if len(candles) >= 2:
+                prices = [candle["close"] for candle in candles]
+                sma_short = sum(prices[-3:]) / 3
+                sma_long = sum(prices[:3]) / 3
+                return 1 if sma_short > sma_long else -1 if sma_short < sma_long else 0
+        return 0
+
+    async def _fetch_timesales(self, symbol, start_ts, end_ts):
+        logger.debug("Fetching timesales for %s from Alpaca API", symbol)
+        params = {
+            "symbols": symbol,
+            "timeframe": "1Min",
+            "start": start_ts,
+            "end": end_ts
+        }
+        logger.debug("Alpaca timesales request parameters for %s: %s", symbol, params)
         try:
-            sentiment_scores = await self.stock_sentiment.get_stock_sentiment_batch(valid_symbols_to_fetch)
+            alpaca_url = f"{self.alpaca_base_url.rstrip('/')}/v2/stocks/bars"
+            data = await self._make_api_request(
+                alpaca_url,
+                params=params,
+                use_alpaca=True
+            )
+            logger.debug("Alpaca API Response for %s: %s", symbol, data)
+            # Handle both possible structures: bars as a list or bars as a dict with symbol keys
+            bars_data = data.get("bars", [])
+            if isinstance(bars_data, dict):
+                bars = bars_data.get(symbol, [])
+            else:
+                bars = bars_data
+            if not bars or not isinstance(bars, list) or not all(isinstance(bar, dict) for bar in bars):
+                logger.warning("No valid trade data available for %s from Alpaca. Response: %s", symbol, data)
+                return symbol, []
+            trades = [
+                {
+                    "price": bar["c"],
+                    "volume": bar["v"],
+                    "time": bar["t"]
+                }
+                for bar in bars
+            ]
+            return symbol, trades
         except Exception as e:
-            logger.error(f"Error fetching sentiment for symbols: {str(e)}")
+            logger.error("Error fetching timesales for %s from Alpaca: %s", symbol, e)
+            return symbol, []
+
+    async def _get_sentiment_scores(self, symbols):
+        try:
+            return await self.stock_sentiment.get_stock_sentiment_batch(symbols)
+        except Exception as e:
+            logger.error("Error fetching sentiment for symbols: %s", e)
             if isinstance(e, AttributeError):
                 logger.error("StockSentiment does not have get_stock_sentiment_batch method.")
-            sentiment_scores = {symbol: 0 for symbol in valid_symbols_to_fetch}
+            return {symbol: 0 for symbol in symbols}
+
+    def _trend_split(self, total_volume, trend):
+        """Split total volume into buy/sell volume using only the price trend."""
+        if trend > 0:
+            buy_volume = int(total_volume * 0.6)
+        elif trend < 0:
+            buy_volume = int(total_volume * 0.4)
+        else:
+            buy_volume = total_volume // 2
+        return buy_volume, total_volume - buy_volume
+
+    def compute_buy_sell(self, symbols, raw_volumes, bid_ask_data, total_volumes):
+        """
+        Infer buy/sell volumes from prefetched raw data. Performs no I/O.
+        Args:
+            symbols: List of stock symbols.
+            raw_volumes: Result of fetch_raw_volumes.
+            bid_ask_data: Dictionary mapping symbols to (bid, ask).
+            total_volumes: Dictionary mapping symbols to total traded volume.
+        Returns:
+            Dictionary mapping symbols to (buy_volume, sell_volume).
+        """
+        price_trends = raw_volumes["trends"]
+        trades_by_symbol = raw_volumes["trades"]
+        sentiment_scores = raw_volumes["sentiment"]
 
-        for symbol in valid_symbols_to_fetch:
+        results = {}
+        for symbol in symbols:
             trades = trades_by_symbol.get(symbol, [])
             bid, ask = bid_ask_data.get(symbol, (0, 0))
             trend = price_trends.get(symbol, 0)
 
             if bid == 0 or ask == 0:
-                logger.warning(f"No valid bid/ask data for {symbol}. Using trend-based split.")
-                total_volume = total_volumes.get(symbol, 0)
-                if trend > 0:
-                    buy_volume = int(total_volume * 0.6)
-                    sell_volume = total_volume - buy_volume
-                elif trend < 0:
-                    buy_volume = int(total_volume * 0.4)
-                    sell_volume = total_volume - buy_volume
-                else:
-                    buy_volume = total_volume // 2
-                    sell_volume = total_volume - buy_volume
-                results[symbol] = (buy_volume, sell_volume)
-                self.buy_sell_cache[symbol] = {
-                    "buy_volume": buy_volume,
-                    "sell_volume": sell_volume,
-                    "timestamp": current_time
-                }
+                logger.warning("No valid bid/ask data for %s. Using trend-based split.", symbol)
+                results[symbol] = self._trend_split(total_volumes.get(symbol, 0), trend)
                 continue
 
             if not trades:
-                logger.warning(f"No trade data available for {symbol}. Using trend-based split.")
-                total_volume = total_volumes.get(symbol, 0)
-                if trend > 0:
-                    buy_volume = int(total_volume * 0.6)
-                    sell_volume = total_volume - buy_volume
-                elif trend < 0:
-                    buy_volume = int(total_volume * 0.4)
-                    sell_volume = total_volume - buy_volume
-                else:
-                    buy_volume = total_volume // 2
-                    sell_volume = total_volume - buy_volume
-                results[symbol] = (buy_volume, sell_volume)
-                self.buy_sell_cache[symbol] = {
-                    "buy_volume": buy_volume,
-                    "sell_volume": sell_volume,
-                    "timestamp": current_time
-                }
+                logger.warning("No trade data available for %s. Using trend-based split.", symbol)
+                results[symbol] = self._trend_split(total_volumes.get(symbol, 0), trend)
                 continue
 
             sentiment_score = sentiment_scores.get(symbol, 0)
@@ -608,18 +568,13 @@ class MarketData:
                         recent_sells -= 1
 
             results[symbol] = (buy_volume, sell_volume)
-            self.buy_sell_cache[symbol] = {
-                "buy_volume": buy_volume,
-                "sell_volume": sell_volume,
-                "timestamp": current_time
-            }
-            logger.debug(f"Inferred fresh buy/sell volume for {symbol}: Buy={buy_volume}, Sell={sell_volume}")
+            logger.debug("Inferred fresh buy/sell volume for %s: Buy=%s, Sell=%s", symbol, buy_volume, sell_volume)
 
         return results
 
     async def _get_approximate_market_cap(self, symbol):
         try:
-            logger.debug(f"Fetching market cap for {symbol} using yfinance")
+            logger.debug("Fetching market cap for %s using yfinance", symbol)
             loop = asyncio.get_running_loop()
             ticker = yf.Ticker(symbol)
             info = await loop.run_in_executor(None, lambda: ticker.info)
@@ -627,10 +582,5 @@ class MarketData:
             market_cap_millions = market_cap / 1e6
             return market_cap_millions
         except Exception as e:
-            logger.error(f"Error fetching market cap for {symbol} using yfinance: {str(e)}")
-            return 0
-
-    logger.setLevel(logging.DEBUG)
-    handler = logging.StreamHandler()
-    handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] [%(threadName)s] %(name)s: %(message)s"))
-    logger.addHandler(handler)
\ No newline at end of file
+            logger.error("Error fetching market cap for %s using yfinance: %s", symbol, e)
+            return 0
\ No newline at end of file
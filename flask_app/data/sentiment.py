@@ -10,17 +10,19 @@ from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 from flask_app import logger
 
 class StockSentiment:
-    def __init__(self, alpaca_base_url, alpaca_headers, rate_limit_per_second):
+    def __init__(self, alpaca_base_url, alpaca_headers, rate_limit_per_second, get_session):
         """
         Initialize the StockSentiment class for fetching and analyzing stock news sentiment.
         Args:
             alpaca_base_url: Base URL for Alpaca API.
             alpaca_headers: Headers for Alpaca API requests (with API key and secret).
             rate_limit_per_second: Rate limit for Alpaca API requests (default: 3.33 requests/sec).
+            get_session: Callable returning the shared aiohttp.ClientSession.
         """
         self.alpaca_base_url = alpaca_base_url
         self.alpaca_headers = alpaca_headers
         self.rate_limit_per_second = rate_limit_per_second
+        self.get_session = get_session
         self.last_request_time = 0
         self.lock = asyncio.Lock()  # Changed from threading.Lock to asyncio.Lock
         self.sentiment_analyzer = SentimentIntensityAnalyzer()
@@ -32,7 +34,7 @@ class StockSentiment:
             time_since_last = current_time - self.last_request_time
             sleep_time = (1 / self.rate_limit_per_second) - time_since_last
             if sleep_time > 0:
-                logger.debug(f"Rate limiting: sleeping for {sleep_time:.2f} seconds")
+                logger.debug("Rate limiting: sleeping for %.2f seconds", sleep_time)
                 await asyncio.sleep(sleep_time)
             self.last_request_time = time.time()
 
@@ -40,15 +42,14 @@ class StockSentiment:
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=1, max=10),
         retry=retry_if_exception_type(aiohttp.ClientResponseError),
-        before_sleep=lambda retry_state: logger.debug(f"Retrying API request (attempt {retry_state.attempt_number})...")
+        before_sleep=lambda retry_state: logger.debug("Retrying API request (attempt %s)...", retry_state.attempt_number)
     )
     async def _make_api_request(self, url, params):
         """Make an async API request to Alpaca with rate limiting and retry logic."""
         await self._rate_limit()
-        async with aiohttp.ClientSession(headers=self.alpaca_headers) as session:
-            async with session.get(url, params=params) as response:
-                response.raise_for_status()
-                return await response.json()
+        async with self.get_session().get(url, params=params, headers=self.alpaca_headers) as response:
+            response.raise_for_status()
+            return await response.json()
 
     def _validate_symbol(self, symbol):
         """Validate the stock symbol."""
@@ -73,7 +74,7 @@ class StockSentiment:
         """
         # Validate the symbol before making the API call
         if not self._validate_symbol(symbol):
-            logger.warning(f"Invalid symbol {symbol} for sentiment analysis. Using neutral sentiment.")
+            logger.warning("Invalid symbol %s for sentiment analysis. Using neutral sentiment.", symbol)
             return 0.0
 
         try:
@@ -85,7 +86,7 @@ class StockSentiment:
             # Format timestamps for Alpaca
             start_ts = news_start_time.strftime("%Y-%m-%dT%H:%M:%SZ")
             end_ts = news_end_time.strftime("%Y-%m-%dT%H:%M:%SZ")
-            logger.debug(f"Fetching news for {symbol} from {start_ts} to {end_ts}")
+            logger.debug("Fetching news for %s from %s to %s", symbol, start_ts, end_ts)
 
             # Fetch news from Alpaca
             news_data = await self._make_api_request(
@@ -99,7 +100,7 @@ class StockSentiment:
             )
 
             if not news_data or "news" not in news_data:
-                logger.warning(f"No news data available for {symbol} in the specified time range.")
+                logger.warning("No news data available for %s in the specified time range.", symbol)
                 return 0.0
 
             # Analyze sentiment of news headlines and summaries
@@ -112,34 +113,34 @@ class StockSentiment:
                 sentiment_scores.append(sentiment["compound"])
 
             if not sentiment_scores:
-                logger.warning(f"No valid news text found for {symbol}. Using neutral sentiment.")
+                logger.warning("No valid news text found for %s. Using neutral sentiment.", symbol)
                 return 0.0
 
             # Average the sentiment scores
             avg_sentiment = sum(sentiment_scores) / len(sentiment_scores)
-            logger.debug(f"Computed sentiment score for {symbol}: {avg_sentiment}")
+            logger.debug("Computed sentiment score for %s: %s", symbol, avg_sentiment)
             return avg_sentiment
 
         except aiohttp.ClientResponseError as http_err:
-            logger.error(f"HTTP Error fetching news for {symbol} from Alpaca: {str(http_err)}")
-            logger.error(f"Status Code: {http_err.status}")
-            logger.error(f"Response Text: {http_err.message}")
+            logger.error("HTTP Error fetching news for %s from Alpaca: %s", symbol, http_err)
+            logger.error("Status Code: %s", http_err.status)
+            logger.error("Response Text: %s", http_err.message)
             return 0.0
         except tenacity.RetryError as retry_err:
-            logger.error(f"RetryError fetching news for {symbol} from Alpaca after all attempts: {str(retry_err)}")
+            logger.error("RetryError fetching news for %s from Alpaca after all attempts: %s", symbol, retry_err)
             if retry_err.last_attempt and retry_err.last_attempt.failed:
                 last_error = retry_err.last_attempt.exception()
-                logger.error(f"Last error: {str(last_error)}")
+                logger.error("Last error: %s", last_error)
                 if isinstance(last_error, aiohttp.ClientResponseError):
-                    logger.error(f"Status Code: {last_error.status}")
-                    logger.error(f"Response Text: {last_error.message}")
+                    logger.error("Status Code: %s", last_error.status)
+                    logger.error("Response Text: %s", last_error.message)
                 else:
                     logger.error("Last error is not a ClientResponseError.")
             else:
                 logger.error("No last attempt information available.")
             return 0.0
         except Exception as e:
-            logger.error(f"Unexpected error computing sentiment for {symbol}: {str(e)}")
+            logger.error("Unexpected error computing sentiment for %s: %s", symbol, e)
             return 0.0
         
     async def get_stock_sentiment_batch(self, symbols):
@@ -152,7 +153,7 @@ class StockSentiment:
         """
         # Validate symbols
         if not self._validate_symbols(symbols):
-            logger.warning(f"Invalid symbols {symbols} for sentiment analysis. Using neutral sentiment.")
+            logger.warning("Invalid symbols %s for sentiment analysis. Using neutral sentiment.", symbols)
             return {symbol: 0.0 for symbol in symbols}
 
         try:
@@ -165,7 +166,7 @@ class StockSentiment:
             start_ts = news_start_time.strftime("%Y-%m-%dT%H:%M:%SZ")
             end_ts = news_end_time.strftime("%Y-%m-%dT%H:%M:%SZ")
             symbols_str = ",".join(symbols)
-            logger.debug(f"Fetching news for symbols {symbols_str} from {start_ts} to {end_ts}")
+            logger.debug("Fetching news for symbols %s from %s to %s", symbols_str, start_ts, end_ts)
 
             # Fetch news from Alpaca for all symbols in a single request
             news_data = await self._make_api_request(
@@ -179,7 +180,7 @@ class StockSentiment:
             )
 
             if not news_data or "news" not in news_data:
-                logger.warning(f"No news data available for symbols {symbols_str} in the specified time range.")
+                logger.warning("No news data available for symbols %s in the specified time range.", symbols_str)
                 return {symbol: 0.0 for symbol in symbols}
 
             # Group news articles by symbol
@@ -195,7 +196,7 @@ class StockSentiment:
             for symbol in symbols:
                 articles = news_by_symbol[symbol]
                 if not articles:
-                    logger.warning(f"No news articles found for {symbol}. Using neutral sentiment.")
+                    logger.warning("No news articles found for %s. Using neutral sentiment.", symbol)
                     sentiment_scores[symbol] = 0.0
                     continue
 
@@ -208,32 +209,32 @@ class StockSentiment:
                     sentiment_scores_list.append(sentiment["compound"])
 
                 if not sentiment_scores_list:
-                    logger.warning(f"No valid news text found for {symbol}. Using neutral sentiment.")
+                    logger.warning("No valid news text found for %s. Using neutral sentiment.", symbol)
                     sentiment_scores[symbol] = 0.0
                 else:
                     avg_sentiment = sum(sentiment_scores_list) / len(sentiment_scores_list)
-                    logger.debug(f"Computed sentiment score for {symbol}: {avg_sentiment}")
+                    logger.debug("Computed sentiment score for %s: %s", symbol, avg_sentiment)
                     sentiment_scores[symbol] = avg_sentiment
 
             return sentiment_scores
         except aiohttp.ClientResponseError as http_err:
-            logger.error(f"HTTP Error fetching news for symbols {symbols_str} from Alpaca: {str(http_err)}")
-            logger.error(f"Status Code: {http_err.status}")
-            logger.error(f"Response Text: {http_err.message}")
+            logger.error("HTTP Error fetching news for symbols %s from Alpaca: %s", symbols_str, http_err)
+            logger.error("Status Code: %s", http_err.status)
+            logger.error("Response Text: %s", http_err.message)
             return {symbol: 0.0 for symbol in symbols}
         except tenacity.RetryError as retry_err:
-            logger.error(f"RetryError fetching news for symbols {symbols_str} from Alpaca after all attempts: {str(retry_err)}")
+            logger.error("RetryError fetching news for symbols %s from Alpaca after all attempts: %s", symbols_str, retry_err)
             if retry_err.last_attempt and retry_err.last_attempt.failed:
                 last_error = retry_err.last_attempt.exception()
-                logger.error(f"Last error: {str(last_error)}")
+                logger.error("Last error: %s", last_error)
                 if isinstance(last_error, aiohttp.ClientResponseError):
-                    logger.error(f"Status Code: {last_error.status}")
-                    logger.error(f"Response Text: {last_error.message}")
+                    logger.error("Status Code: %s", last_error.status)
+                    logger.error("Response Text: %s", last_error.message)
                 else:
                     logger.error("Last error is not a ClientResponseError.")
             else:
                 logger.error("No last attempt information available.")
             return {symbol: 0.0 for symbol in symbols}
         except Exception as e:
-            logger.error(f"Unexpected error computing sentiment for symbols {symbols_str}: {str(e)}")
+            logger.error("Unexpected error computing sentiment for symbols %s: %s", symbols_str, e)
             return {symbol: 0.0 for symbol in symbols}
\ No newline at end of file
@@ -0,0 +1,9 @@
+# gunicorn.conf.py
+# Production server settings, loaded automatically by `gunicorn app:app` from the project root.
+from flask_app.config import Config
+
+bind = f"{Config.FLASK_HOST}:{Config.FLASK_PORT}"
+workers = Config.SERVER_WORKERS
+# The app is ASGI, so each worker runs a uvicorn event loop that multiplexes upstream I/O
+worker_class = "uvicorn.workers.UvicornWorker"
+keepalive = 30